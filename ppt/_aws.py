@@ -24,6 +24,16 @@ def upload_file(file_path, dest_path, bucket, key, secret):
     s3.Bucket(bucket).upload_file(file_path, dest_path)
 
 
+def delete_files(dest_paths, bucket, key, secret):
+    import boto3
+
+    s3 = boto3.resource("s3", aws_access_key_id=key, aws_secret_access_key=secret)
+    # S3 deletes at most 1000 objects per request:
+    for i in range(0, len(dest_paths), 1000):
+        objects = [{"Key": p} for p in dest_paths[i : i + 1000]]
+        s3.Bucket(bucket).delete_objects(Delete={"Objects": objects})
+
+
 def _iter_files_recursive(dir_path):
     for subdir_path, dir_names, file_names in os.walk(dir_path):
         for file_name in file_names:
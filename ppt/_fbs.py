@@ -1,3 +1,6 @@
+from ppt_runtime.settings import MODULE_NAME as _PUBLIC_SETTINGS_MODULE
+from os import makedirs
+from os.path import join
 from ppt.platform import (
     is_ubuntu,
     is_linux,
@@ -31,3 +34,16 @@ def get_default_profiles():
 
 def filter_public_settings(settings):
     return {k: settings[k] for k in settings["public_settings"]}
+
+
+def write_public_settings_module(settings, dest_dir):
+    """
+    Write the public settings to a Python module in dest_dir, for
+    ppt_runtime.settings. Return the module's name.
+    """
+    public_settings = filter_public_settings(settings)
+    makedirs(dest_dir, exist_ok=True)
+    with open(join(dest_dir, _PUBLIC_SETTINGS_MODULE + ".py"), "w") as f:
+        f.write("# Generated by ppt. Do not edit.\n")
+        f.write("SETTINGS = %r\n" % (public_settings,))
+    return _PUBLIC_SETTINGS_MODULE
@@ -0,0 +1,172 @@
+"""
+This INTERNAL module contains file system helpers shared by several of ppt's
+build steps.
+"""
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from os.path import islink, join, relpath
+from shutil import copy2, copystat, copytree
+
+import hashlib
+import os
+
+# The Linux ioctl for cloning a file, from <linux/fs.h>:
+_FICLONE = 0x40049409
+
+
+def hash_file(file_path, algorithm="sha256"):
+    with open(file_path, "rb") as f:
+        try:
+            file_digest = hashlib.file_digest
+        except AttributeError:
+            # Python < 3.11:
+            hasher = hashlib.new(algorithm)
+            for buf in iter(lambda: f.read(65536), b""):
+                hasher.update(buf)
+            return hasher.hexdigest()
+        return file_digest(f, algorithm).hexdigest()
+
+
+def is_elf(file_path):
+    try:
+        with open(file_path, "rb") as f:
+            return f.read(4) == b"\x7fELF"
+    except OSError:
+        return False
+
+
+def hash_files(file_paths, algorithm="sha256"):
+    """
+    Hash the given files in a thread pool. Returns a list of hex digests in
+    the same order as file_paths.
+    """
+    with ThreadPoolExecutor() as executor:
+        return list(executor.map(hash_file, file_paths, repeat(algorithm)))
+
+
+def hash_tree(dir_path):
+    """
+    Return a dict mapping the "/" separated path of each file below dir_path
+    to its SHA-256. Symbolic links map to their target instead.
+    """
+    file_paths, links = [], {}
+    for subdir, dir_names, files in os.walk(dir_path):
+        for name in dir_names + files:
+            path = join(subdir, name)
+            if islink(path):
+                links[path] = "-> " + os.readlink(path)
+            elif name in files:
+                file_paths.append(path)
+    result = dict(zip(file_paths, hash_files(file_paths)))
+    result.update(links)
+    return {
+        relpath(path, dir_path).replace(os.sep, "/"): digest
+        for path, digest in sorted(result.items())
+    }
+
+
+def set_mtimes(dir_path, mtime):
+    """
+    Set the modification and access times of dir_path and everything below it
+    to mtime. Symbolic links themselves are changed, not their targets.
+    """
+    # Some platforms can't change the times of a link itself:
+    can_set_link_times = os.utime in os.supports_follow_symlinks
+    for subdir, dir_names, files in os.walk(dir_path, topdown=False):
+        for name in dir_names + files:
+            path = join(subdir, name)
+            if islink(path) and not can_set_link_times:
+                continue
+            os.utime(path, (mtime, mtime), follow_symlinks=False)
+    os.utime(dir_path, (mtime, mtime))
+
+
+def deduplicate_files(dir_path):
+    """
+    Replace byte-identical files below dir_path by hard links to a single
+    copy. Returns the number of bytes saved.
+    """
+    by_size = defaultdict(list)
+    for subdir, _, files in os.walk(dir_path):
+        for file_ in files:
+            file_path = join(subdir, file_)
+            if islink(file_path):
+                continue
+            stat = os.stat(file_path)
+            if stat.st_size:
+                # Hard links share permissions. So only files with the same
+                # mode can be merged:
+                by_size[(stat.st_size, stat.st_mode)].append(file_path)
+    # Only files whose size occurs more than once can have duplicates:
+    candidates = sorted(
+        (p, key) for key, paths in by_size.items() if len(paths) > 1 for p in paths
+    )
+    by_hash = defaultdict(list)
+    digests = hash_files([p for p, _ in candidates])
+    for (file_path, key), digest in zip(candidates, digests):
+        by_hash[key + (digest,)].append(file_path)
+    saved = 0
+    for original, *duplicates in by_hash.values():
+        original_stat = os.stat(original)
+        for duplicate in duplicates:
+            if os.path.samestat(original_stat, os.stat(duplicate)):
+                continue
+            tmp_path = duplicate + ".ppt-link"
+            os.link(original, tmp_path)
+            os.replace(tmp_path, duplicate)
+            saved += original_stat.st_size
+    return saved
+
+
+def link_tree(src_dir, dest_dir):
+    """
+    Like shutil.copytree(...), but creates hard links of the files in src_dir
+    instead of copying them. Where this is not possible, eg. across file
+    systems, fall back to reflinks and finally to copying. Files that are hard
+    links of each other in src_dir are also hard links of each other in
+    dest_dir. Because the files may be shared with src_dir, they must not be
+    modified in place.
+    """
+    copied = {}
+
+    def copy_function(src, dest):
+        try:
+            os.link(src, dest)
+            return dest
+        except OSError:
+            pass
+        stat = os.stat(src)
+        key = stat.st_dev, stat.st_ino
+        if stat.st_nlink > 1 and key in copied:
+            os.link(copied[key], dest)
+        else:
+            if not _reflink(src, dest):
+                copy2(src, dest)
+            copied[key] = dest
+        return dest
+
+    return copytree(src_dir, dest_dir, copy_function=copy_function)
+
+
+def _reflink(src, dest):
+    """
+    Create a copy-on-write clone of src at dest. Returns False if the platform
+    or file system does not support this.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    with open(src, "rb") as src_file, open(dest, "wb") as dest_file:
+        try:
+            fcntl.ioctl(dest_file.fileno(), _FICLONE, src_file.fileno())
+        except OSError:
+            success = False
+        else:
+            success = True
+    if success:
+        copystat(src, dest)
+    else:
+        os.remove(dest)
+    return success
@@ -1,34 +1,124 @@
 from ppt import SETTINGS
 from ppt.error import PbtError
+from ppt.paths import project_path
+from concurrent.futures import ThreadPoolExecutor
+from os import makedirs
+from os.path import join
 from subprocess import run, DEVNULL, check_call, check_output, PIPE, CalledProcessError
 
+import json
 import re
 
 
-def preset_gpg_passphrase():
-    # Ensure gpg-agent is running:
-    run(
-        ["gpg-agent", "--daemon", "--use-standard-socket", "-q"],
-        stdout=DEVNULL,
-        stderr=DEVNULL,
-    )
-    gpg_key = SETTINGS["gpg_key"]
-    try:
-        keygrip = _get_keygrip(gpg_key)
-    except GpgDoesNotSupportKeygrip:
-        # Old GPG versions don't support keygrips; They use the fingerprint
-        # instead:
-        keygrip = gpg_key
-    check_call(
-        [
-            SETTINGS["gpg_preset_passphrase"],
-            "--preset",
-            "--passphrase",
-            SETTINGS["gpg_pass"],
-            keygrip,
-        ],
-        stdout=DEVNULL,
-    )
+class GpgSession:
+    """
+    Starts gpg-agent and presets the passphrase of the "gpg_key" once per ppt
+    run. The agent then signs without prompting. The keygrip of each key is
+    cached in cache/gpg, so later runs don't have to ask gpg for it.
+    """
+
+    _INSTANCE = None
+
+    @classmethod
+    def instance(cls):
+        if cls._INSTANCE is None:
+            cls._INSTANCE = cls(SETTINGS["gpg_key"], project_path("cache/gpg"))
+        return cls._INSTANCE
+
+    def __init__(self, key_id, cache_dir):
+        self._key_id = key_id
+        self._cache_dir = cache_dir
+        self._started = False
+
+    def start(self):
+        if self._started:
+            return
+        # Ensure gpg-agent is running:
+        run(
+            ["gpg-agent", "--daemon", "--use-standard-socket", "-q"],
+            stdout=DEVNULL,
+            stderr=DEVNULL,
+        )
+        check_call(
+            [
+                SETTINGS["gpg_preset_passphrase"],
+                "--preset",
+                "--passphrase",
+                SETTINGS["gpg_pass"],
+                self._get_keygrip(),
+            ],
+            stdout=DEVNULL,
+        )
+        self._started = True
+
+    def detach_sign(self, file_paths, armor=False):
+        """
+        Create <file>.sig (or <file>.asc if armor) for each of the given files.
+        gpg only signs one file per invocation. But with the passphrase in the
+        agent, the invocations are cheap and can run in parallel.
+        """
+        self.start()
+        with ThreadPoolExecutor() as executor:
+            # list(...) re-raises any exceptions:
+            list(executor.map(lambda p: self._detach_sign(p, armor), file_paths))
+
+    def _detach_sign(self, file_path, armor):
+        args = ["gpg", "--batch", "--yes", "-u", self._key_id]
+        if armor:
+            args.append("--armor")
+        output = file_path + (".asc" if armor else ".sig")
+        args.extend(["--output", output, "--detach-sig", file_path])
+        check_call(args, stdout=DEVNULL)
+
+    def clearsign(self, file_path, output):
+        """
+        Write a copy of the given file with an inline signature to output.
+        """
+        self.start()
+        check_call(
+            [
+                "gpg",
+                "--batch",
+                "--yes",
+                "-u",
+                self._key_id,
+                "--output",
+                output,
+                "--clearsign",
+                file_path,
+            ],
+            stdout=DEVNULL,
+        )
+
+    def rpm_addsign(self, file_paths):
+        """
+        Sign the given .rpm packages with a single invocation of rpm.
+        """
+        self.start()
+        check_call(["rpm", "--addsign"] + list(file_paths), stdout=DEVNULL)
+
+    def _get_keygrip(self):
+        cache_path = join(self._cache_dir, "keygrips.json")
+        try:
+            with open(cache_path) as f:
+                keygrips = json.load(f)
+        except (FileNotFoundError, ValueError):
+            keygrips = {}
+        try:
+            return keygrips[self._key_id]
+        except KeyError:
+            pass
+        try:
+            keygrip = _get_keygrip(self._key_id)
+        except GpgDoesNotSupportKeygrip:
+            # Old GPG versions don't support keygrips; They use the fingerprint
+            # instead:
+            keygrip = self._key_id
+        keygrips[self._key_id] = keygrip
+        makedirs(self._cache_dir, exist_ok=True)
+        with open(cache_path, "w") as f:
+            json.dump(keygrips, f, indent=2)
+        return keygrip
 
 
 def _get_keygrip(pubkey_id):
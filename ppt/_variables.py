@@ -5,6 +5,12 @@ from ppt.error import PbtError
 from ppt._util import _get_attr
 from ppt.paths import project_path, get_python_path
 from packaging.version import Version, InvalidVersion
+from subprocess import run, DEVNULL, PIPE
+
+import os
+
+# 1980-01-01. Zip files can't store earlier timestamps:
+_DEFAULT_SOURCE_DATE_EPOCH = 315532800
 
 
 def resolve_variables():
@@ -52,3 +58,34 @@ def set_version(version_string: str):
         SETTINGS["major"] = parsed_version.major
         SETTINGS["minor"] = parsed_version.minor
         SETTINGS["patch"] = parsed_version.micro
+
+
+def get_source_date_epoch():
+    """
+    Return the timestamp that reproducible build outputs use for all files, as
+    per https://reproducible-builds.org/specs/source-date-epoch/. This is the
+    environment variable SOURCE_DATE_EPOCH if set. Otherwise, when the setting
+    "reproducible" is true, it is the time of the last Git commit. Returns None
+    if builds are not meant to be reproducible.
+    """
+    try:
+        return int(os.environ["SOURCE_DATE_EPOCH"])
+    except (KeyError, ValueError):
+        pass
+    if not SETTINGS.get("reproducible"):
+        return None
+    try:
+        process = run(
+            ["git", "log", "-1", "--format=%ct"],
+            cwd=project_path("."),
+            stdout=PIPE,
+            stderr=DEVNULL,
+            text=True,
+        )
+    except FileNotFoundError:
+        return _DEFAULT_SOURCE_DATE_EPOCH
+    try:
+        return int(process.stdout.strip())
+    except ValueError:
+        # Not a Git repository, or no commits yet:
+        return _DEFAULT_SOURCE_DATE_EPOCH
@@ -4,6 +4,9 @@ run `ppt <command>` on the command line. But you are also free to import them in
 your Python build script and execute them there.
 """
 from ppt import SETTINGS, activate_profile
+from ppt._fbs import write_public_settings_module
+from ppt._state import LOADED_PROFILES
+from ppt._files import set_mtimes
 from ppt.builtin_commands._util import (
     prompt_for_value,
     is_valid_version,
@@ -11,8 +14,11 @@ from ppt.builtin_commands._util import (
     update_json,
     require_frozen_app,
     require_installer,
+    LINUX_JSON,
 )
 from ppt.cmdline import command
+from ppt.delta import record_release
+from ppt.repo import get_repo_dir
 from ppt.resources import copy_with_filtering
 from ppt.upload import _upload_repo
 from ppt.error import PbtError
@@ -29,10 +35,10 @@ from ppt.paths import (
     get_script_path,
     get_python_path,
     get_build_system_dir,
+    get_settings_paths,
     project_path,
-    get_project_root,
 )
-from ppt._variables import get_version, set_version
+from ppt._variables import get_source_date_epoch, get_version, set_version
 from getpass import getuser
 from importlib.util import find_spec
 from os import listdir, remove, unlink, mkdir
@@ -40,6 +46,7 @@ from os.path import join, isfile, isdir, islink, dirname, exists, relpath
 from shutil import rmtree
 from unittest import TestSuite, TextTestRunner, defaultTestLoader
 
+import json
 import logging
 import os
 import subprocess
@@ -104,15 +111,33 @@ def run():
     Run your app from source
     """
     require_existing_project()
+    path, env = get_run_env()
+    subprocess.run([sys.executable, path], env=env)
+
+
+def get_run_env():
+    """
+    Return the path of the app's main script and the environment to run it in
+    from source.
+    """
     env = dict(os.environ)
     path, extend = get_script_path()
+    pythonpath = []
     if extend:
-        pythonpath = project_path(get_python_path())
+        pythonpath.append(project_path(get_python_path()))
+    if "public_settings" in SETTINGS:
+        # Let ppt_runtime.settings find the public settings:
+        settings_dir = project_path("target/public_settings")
+        write_public_settings_module(SETTINGS, settings_dir)
+        pythonpath.append(settings_dir)
+    if pythonpath:
         old_pythonpath = env.get("PYTHONPATH", "")
         if old_pythonpath:
-            pythonpath += os.pathsep + old_pythonpath
-        env["PYTHONPATH"] = pythonpath
-    subprocess.run([sys.executable, path], env=env)
+            pythonpath.append(old_pythonpath)
+        env["PYTHONPATH"] = os.pathsep.join(pythonpath)
+    # Let ppt_runtime.resources find the loose resource files:
+    env["PPT_RESOURCES_DIR"] = project_path("${build_system_dir}/resources")
+    return path, env
 
 
 @command
@@ -167,11 +192,19 @@ def freeze(debug=False):
                 freeze_linux(debug=debug)
         else:
             raise PbtError("Unsupported OS")
+    if SETTINGS.get("reproducible"):
+        set_mtimes(project_path("${freeze_dir}"), get_source_date_epoch())
     _LOG.info(
         "Done. You can now run `%s`. If that doesn't work, see "
         "https://build-system.fman.io/troubleshooting.",
         executable,
     )
+    executables = SETTINGS.get("executables", {})
+    if executables:
+        _LOG.info(
+            "The same directory also contains the executables %s.",
+            ", ".join(sorted(executables)),
+        )
 
 
 @command
@@ -195,16 +228,23 @@ def sign():
 
 
 @command
-def installer():
+def installer(benchmark_compression=False):
     """
     Create an installer for your app
     """
     require_frozen_app()
+    if benchmark_compression:
+        if not is_linux():
+            raise PbtError("--benchmark_compression is only supported on Linux.")
+        _benchmark_compression()
     linux_distribution_not_supported_msg = (
         "Your Linux distribution is not supported, sorry. "
         "You can run `ppt buildvm` followed by `ppt runvm` to start a Docker "
         "VM of a supported distribution."
     )
+    if is_linux() and SETTINGS.get("installer_formats"):
+        _create_linux_installers(SETTINGS["installer_formats"])
+        return
     try:
         installer_fname = SETTINGS["installer"]
         print(f'system to generate installer {installer_fname}')
@@ -257,6 +297,121 @@ def installer():
     _LOG.info(" ".join(msg_parts))
 
 
+def _benchmark_compression():
+    from ppt.installer.compression import benchmark_compression
+    from ppt.installer.linux import (
+        check_compression,
+        generate_installer_files,
+        get_supported_codecs,
+    )
+
+    formats = _get_linux_installer_formats()
+    generate_installer_files()
+    sample_mb = SETTINGS.get("compression_benchmark_sample_mb", 64)
+    # The expected download speed of your users, in MB/s:
+    bandwidth_mb = SETTINGS.get("compression_benchmark_bandwidth", 10)
+    _LOG.info("Benchmarking compression on %d MB of target/installer.", sample_mb)
+    results = benchmark_compression(
+        project_path("target/installer"),
+        sample_mb * 1024 * 1024,
+        bandwidth_mb * 1024 * 1024,
+        # Only the codecs all packages can use:
+        get_supported_codecs(formats),
+    )
+    lines = ["Codec  Level  Ratio  Compress  Decompress  Est. total"]
+    for r in results:
+        lines.append(
+            "%-6s %5d %6.2f %8.2fs %10.2fs %10.2fs"
+            % (
+                r["codec"],
+                r["level"],
+                r["ratio"],
+                r["compress_time"],
+                r["decompress_time"],
+                r["cost"],
+            )
+        )
+    _LOG.info("\n".join(lines))
+    best = results[0]
+    check_compression(best["codec"], formats)
+    update = {
+        "installer_compression": best["codec"],
+        "installer_compression_level": best["level"],
+    }
+    update_json(project_path(LINUX_JSON), update)
+    SETTINGS.update(update)
+    if "pacman" in formats:
+        _rename_pacman_installer(best["codec"])
+    _LOG.info(
+        "Chose %s at level %d and saved it in %s.",
+        best["codec"],
+        best["level"],
+        LINUX_JSON,
+    )
+
+
+def _rename_pacman_installer(codec):
+    """
+    Give the "installer" setting the extension pacman expects for codec. Update
+    it in the settings file that defines it, so no other file overrides it.
+    """
+    from ppt.installer.linux import rename_pacman_installer
+
+    if "installer" not in SETTINGS:
+        return
+    settings_dir = project_path("${build_system_dir}/build/settings")
+    # Settings files of the most specific profile come last:
+    json_path = join(settings_dir, LOADED_PROFILES[-1] + ".json")
+    raw_value = SETTINGS["installer"]
+    for path in get_settings_paths(LOADED_PROFILES):
+        if dirname(path) != settings_dir:
+            # One of ppt's default settings files:
+            continue
+        with open(path) as f:
+            settings = json.load(f)
+        if "installer" in settings:
+            json_path, raw_value = path, settings["installer"]
+    new_value = rename_pacman_installer(raw_value, codec)
+    if new_value != raw_value:
+        update_json(json_path, {"installer": new_value})
+        SETTINGS["installer"] = rename_pacman_installer(SETTINGS["installer"], codec)
+        _LOG.info("Changed the installer's name to %s.", SETTINGS["installer"])
+
+
+def _get_linux_installer_formats():
+    if SETTINGS.get("installer_formats"):
+        return SETTINGS["installer_formats"]
+    if is_ubuntu():
+        return ["deb"]
+    if is_arch_linux():
+        return ["pacman"]
+    if is_fedora():
+        return ["rpm"]
+    raise PbtError(
+        "Your Linux distribution is not supported. Please set installer_formats."
+    )
+
+
+def _create_linux_installers(formats):
+    from ppt.installer.linux import create_installers, generate_installer_files
+
+    generate_installer_files()
+    dests = create_installers(formats)
+    app_name = SETTINGS["app_name"]
+    install_cmds = {
+        "deb": "sudo dpkg -i %s",
+        "rpm": "sudo dnf install %s",
+        "pacman": "sudo pacman -U %s",
+    }
+    lines = ["Created:"]
+    for output_type, dest in zip(formats, dests):
+        out_file = relpath(dest, project_path("."))
+        lines.append(" * %s. Install it via:" % out_file)
+        lines.append("    " + install_cmds[output_type] % out_file)
+    lines.append("These place %s in /opt/%s." % (app_name, app_name))
+    _LOG.info("\n".join(lines))
+
+
 @command
 def sign_installer():
     """
@@ -324,7 +479,7 @@ def repo():
             "    sudo apt-key del %s\n"
             "    sudo rm /etc/apt/sources.list.d/%s.list\n"
             "    sudo apt-get update",
-            project_path("target/repo"),
+            get_repo_dir(),
             pkg_name,
             project_path("${build_system_dir}/sign/linux/public-key.gpg"),
             pkg_name,
@@ -350,7 +505,7 @@ def repo():
             "    sudo pacman-key --delete %s\n"
             "    sudo mv /etc/pacman.conf.bu /etc/pacman.conf",
             app_name,
-            project_path("target/repo"),
+            get_repo_dir(),
             project_path("${build_system_dir}/sign/linux/public-key.gpg"),
             gpg_key,
             pkg_name,
@@ -366,14 +521,14 @@ def repo():
         _LOG.info(
             "Done. You can test the repository with the following commands:\n"
             "    sudo rpm -v --import %s\n"
-            "    sudo dnf config-manager --add-repo file://%s/target/repo\n"
+            "    sudo dnf config-manager --add-repo file://%s\n"
             "    sudo dnf install %s\n"
             "To revert these changes:\n"
             "    sudo dnf remove %s\n"
             "    sudo rm /etc/yum.repos.d/*%s*.repo\n"
             "    sudo rpm --erase gpg-pubkey-%s",
             project_path("${build_system_dir}/sign/linux/public-key.gpg"),
-            get_project_root(),
+            get_repo_dir(),
             pkg_name,
             pkg_name,
             app_name,
@@ -511,6 +666,8 @@ def release(version=None):
         freeze()
         if is_windows() and _has_windows_codesigning_certificate():
             sign()
+        # Keep the release's files, so `ppt delta` can create updates from it:
+        record_release()
         installer()
         if (
             (is_windows() and _has_windows_codesigning_certificate())
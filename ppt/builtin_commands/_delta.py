@@ -0,0 +1,33 @@
+from ppt.builtin_commands._util import require_frozen_app
+from ppt.cmdline import command
+from ppt.delta import create_delta, record_release
+from ppt.paths import project_path
+from os.path import exists, getsize, relpath
+
+import logging
+
+__all__ = ["delta"]
+
+_LOG = logging.getLogger(__name__)
+
+
+@command
+def delta(old):
+    """
+    Create an update from an older release (version or freeze dir) to this one
+    """
+    require_frozen_app()
+    dest = create_delta(old, project_path("target/delta"))
+    # So later releases can create deltas from this one:
+    record_release()
+    message = "Created %s (%.1f MB)." % (
+        relpath(dest, project_path(".")),
+        getsize(dest) / 1024 / 1024,
+    )
+    installer = project_path("target/${installer}")
+    if exists(installer):
+        message += " The full installer has %.1f MB." % (
+            getsize(installer) / 1024 / 1024
+        )
+    message += " `ppt upload` publishes it next to the installer."
+    _LOG.info(message)
@@ -0,0 +1,196 @@
+from ppt import SETTINGS
+from ppt.builtin_commands import get_run_env
+from ppt.builtin_commands._util import (
+    require_existing_project,
+    update_json,
+    BASE_JSON,
+)
+from ppt.cmdline import command
+from ppt.error import PbtError
+from ppt.paths import get_python_path, project_path
+from os.path import exists, join
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import json
+import logging
+import os
+import pkgutil
+import re
+import subprocess
+import sys
+import sysconfig
+
+__all__ = ["trace_imports"]
+
+_LOG = logging.getLogger(__name__)
+
+# Executed in the traced Python process. Records the names of all modules that
+# were imported when the process exits. Modules that were already loaded before
+# the app started come from the interpreter, site (eg. _distutils_hack) or this
+# script itself. They are left out:
+_TRACER = """\
+import atexit, json, sys
+%(setup)s
+_ppt_preloaded = set(sys.modules)
+
+def _ppt_dump_imports():
+    with open(%(out_path)r, "w") as f:
+        json.dump(sorted(set(sys.modules) - _ppt_preloaded), f)
+
+atexit.register(_ppt_dump_imports)
+%(run)s
+"""
+# Like `python <script>`, put the script's directory first on sys.path:
+_RUN_SCRIPT = """\
+sys.argv = [%(path)r]
+sys.path[0] = os.path.dirname(%(path)r)
+runpy.run_path(%(path)r, run_name="__main__")
+"""
+_RUN_TESTS = """\
+for test_dir in %(test_dirs)r:
+    sys.path.insert(0, test_dir)
+    unittest.main(module=None, argv=["", "discover", "-s", test_dir], exit=False)
+"""
+
+
+@command
+def trace_imports(tests=False, write=False):
+    """
+    Suggest hidden_imports/excludes from the modules your app really imports
+    """
+    require_existing_project()
+    frozen_modules = get_frozen_modules()
+    _LOG.info(
+        "Running your %s. Please exercise it and then exit.",
+        "tests" if tests else "app",
+    )
+    imported = _trace_imports(tests)
+    hidden_imports, excludes = suggest_imports(imported, frozen_modules)
+    _LOG.info(
+        "Suggested hidden_imports:%s\nSuggested excludes:%s",
+        "".join("\n * " + m for m in hidden_imports) or " (none)",
+        "".join("\n * " + m for m in excludes) or " (none)",
+    )
+    if write and (hidden_imports or excludes):
+        base_json = project_path(BASE_JSON)
+        with open(base_json, encoding="utf-8") as f:
+            base_settings = json.load(f)
+        update = {}
+        for key, suggested in (
+            ("hidden_imports", hidden_imports),
+            ("excludes", excludes),
+        ):
+            existing = base_settings.get(key, [])
+            new = [m for m in suggested if m not in existing]
+            if new:
+                update[key] = existing + new
+        update_json(base_json, update)
+        _LOG.info("Updated %s.", BASE_JSON)
+
+
+def get_frozen_modules():
+    """
+    Return the names of the Python modules PyInstaller's analysis put into the
+    frozen app during the last `ppt freeze`.
+    """
+    work_dir = project_path("target/PyInstaller/${app_name}")
+    for toc_name in ("Analysis-00.toc", "PYZ-00.toc"):
+        toc_path = join(work_dir, toc_name)
+        if exists(toc_path):
+            break
+    else:
+        raise PbtError(
+            "Could not find PyInstaller's analysis of your app. Please run:\n"
+            "    ppt freeze"
+        )
+    toc = Path(toc_path).read_text(encoding="utf-8")
+    # Older PyInstaller versions write TOC(...) objects:
+    data = eval(toc, {"__builtins__": {}, "TOC": list, "set": set})
+    return sorted(_find_modules(data))
+
+
+def _find_modules(data):
+    if isinstance(data, (list, tuple, set)):
+        if (
+            len(data) == 3
+            and all(isinstance(item, str) for item in data)
+            and data[2] == "PYMODULE"
+        ):
+            yield data[0]
+        else:
+            for item in data:
+                yield from _find_modules(item)
+
+
+def suggest_imports(imported, frozen_modules):
+    """
+    Compare the modules imported at run time with those in the frozen app.
+    Return a pair (hidden_imports, excludes): Imported modules missing from the
+    frozen app, and top-level packages in the frozen app that were never
+    imported.
+    """
+    stdlib = _get_stdlib_modules()
+    is_stdlib = lambda module: module.split(".")[0] in stdlib
+    # PyInstaller's own modules, eg. pyimod01_archive:
+    is_pyinstaller = lambda module: re.match(r"pyi(mod\d|_)", module)
+    imported = set(imported) - {"__main__"}
+    frozen_modules = set(frozen_modules)
+    hidden_imports = sorted(
+        m
+        for m in imported - frozen_modules
+        if not is_stdlib(m) and not is_pyinstaller(m)
+    )
+    imported_packages = {m.split(".")[0] for m in imported}
+    # The trace leaves out the modules Python loads at startup, eg. encodings.
+    # The frozen app can't start without them. So never exclude the stdlib:
+    excludes = sorted(
+        m
+        for m in {m.split(".")[0] for m in frozen_modules} - imported_packages
+        if not is_stdlib(m) and not is_pyinstaller(m)
+    )
+    return hidden_imports, excludes
+
+
+def _get_stdlib_modules():
+    result = set(sys.builtin_module_names)
+    try:
+        result.update(sys.stdlib_module_names)
+    except AttributeError:
+        # Python < 3.10:
+        stdlib_dir = sysconfig.get_paths()["stdlib"]
+        dirs = [stdlib_dir, join(stdlib_dir, "lib-dynload")]
+        result.update(module.name for module in pkgutil.iter_modules(dirs))
+    return result
+
+
+def _trace_imports(tests):
+    path, env = get_run_env()
+    if not tests:
+        return _trace_script_imports(path, env)
+    sys_path = project_path(get_python_path())
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [sys_path, env.get("PYTHONPATH", "")])
+    )
+    test_dirs = [project_path(d) for d in SETTINGS["test_dirs"]]
+    run = _RUN_TESTS % {"test_dirs": [d for d in test_dirs if exists(d)]}
+    return _run_tracer("import unittest", run, env)
+
+
+def _trace_script_imports(path, env):
+    return _run_tracer("import os, runpy", _RUN_SCRIPT % {"path": path}, env)
+
+
+def _run_tracer(setup, run, env):
+    with TemporaryDirectory() as tmp_dir:
+        out_path = join(tmp_dir, "imports.json")
+        tracer = _TRACER % {"setup": setup, "out_path": out_path, "run": run}
+        subprocess.run([sys.executable, "-c", tracer], env=env)
+        try:
+            with open(out_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise PbtError(
+                "Could not record the imported modules. Maybe the app exited "
+                "via os._exit(...)?"
+            ) from None
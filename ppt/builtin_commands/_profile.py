@@ -0,0 +1,198 @@
+from ppt import SETTINGS
+from ppt.builtin_commands._util import get_frozen_executable, require_frozen_app
+from ppt.cmdline import command
+from ppt.error import PbtError
+from ppt.paths import project_path
+from math import ceil
+from os import makedirs
+from os.path import dirname
+from statistics import median
+from subprocess import DEVNULL, PIPE, Popen
+from time import perf_counter
+
+import json
+import logging
+import os
+import re
+import sys
+
+__all__ = ["profile_startup"]
+
+_LOG = logging.getLogger(__name__)
+_REPORT_PATH = "target/startup_profile.json"
+# Kept outside target/ so it survives `ppt clean`:
+_BASELINE_PATH = "cache/startup_profile.json"
+
+
+@command
+def profile_startup():
+    """
+    Measure how fast your frozen app starts and how much memory it uses
+    """
+    require_frozen_app()
+    args = [get_frozen_executable()] + SETTINGS.get("startup_profile_args", [])
+    num_runs = SETTINGS.get("startup_profile_runs", 10)
+    wall_times, max_rss = [], []
+    for _ in range(num_runs):
+        wall_time, rss, _ = _run_once(args)
+        wall_times.append(wall_time)
+        if rss is not None:
+            max_rss.append(rss)
+    report = {
+        "runs": num_runs,
+        "python_optimize": SETTINGS.get("python_optimize", 0),
+        "wall_time": _summarize(wall_times),
+        "max_rss": _summarize(max_rss) if max_rss else None,
+        "imports": _profile_imports(args),
+    }
+    _LOG.info(_format_report(report))
+    with open(project_path(_REPORT_PATH), "w") as f:
+        json.dump(report, f, indent=2)
+    try:
+        with open(project_path(_BASELINE_PATH)) as f:
+            baseline = json.load(f)
+    except (FileNotFoundError, ValueError):
+        baseline = None
+    if baseline:
+        _LOG.info(_format_comparison(report, baseline))
+        regressions = get_regressions(
+            report, baseline, SETTINGS.get("startup_regression_threshold", 0.1)
+        )
+        if regressions:
+            raise PbtError(
+                "Startup regressed compared to the previous run:\n * "
+                + "\n * ".join(regressions)
+            )
+    makedirs(dirname(project_path(_BASELINE_PATH)), exist_ok=True)
+    with open(project_path(_BASELINE_PATH), "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def get_regressions(report, baseline, threshold):
+    """
+    Return a list of messages for the medians in report that exceed the ones
+    in baseline by more than the given fraction.
+    """
+    result = []
+    for key, description in (("wall_time", "Time to exit"), ("max_rss", "Peak RSS")):
+        if not (report.get(key) and baseline.get(key)):
+            continue
+        current, previous = report[key]["median"], baseline[key]["median"]
+        if current > previous * (1 + threshold):
+            result.append(
+                "%s: median %s vs. %s before (+%.0f%%, threshold %.0f%%)"
+                % (
+                    description,
+                    _format_value(key, current),
+                    _format_value(key, previous),
+                    (current / previous - 1) * 100,
+                    threshold * 100,
+                )
+            )
+    return result
+
+
+def _run_once(args, env=None):
+    """
+    Run the given command. Return its wall-clock time in seconds, peak RSS in
+    bytes (None if not available) and stderr.
+    """
+    start = perf_counter()
+    process = Popen(args, env=env, stdout=DEVNULL, stderr=PIPE)
+    stderr = process.stderr.read()
+    process.stderr.close()
+    if hasattr(os, "wait4"):
+        # Unlike resource.getrusage(RUSAGE_CHILDREN), which reports the
+        # maximum over all children so far, wait4 gives us this run's usage:
+        _, status, rusage = os.wait4(process.pid, 0)
+        process.returncode = _get_exit_code(status)
+        # ru_maxrss is in kilobytes on Linux but in bytes on macOS:
+        rss = rusage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    else:
+        process.wait()
+        rss = None
+    wall_time = perf_counter() - start
+    if process.returncode:
+        raise PbtError(
+            "%s exited with code %d. Please set startup_profile_args so your app "
+            "exits after starting up." % (args[0], process.returncode)
+        )
+    return wall_time, rss, stderr.decode("utf-8", "replace")
+
+
+def _get_exit_code(wait_status):
+    # Like os.waitstatus_to_exitcode(...), which requires Python >= 3.9:
+    if os.WIFSIGNALED(wait_status):
+        return -os.WTERMSIG(wait_status)
+    return os.WEXITSTATUS(wait_status)
+
+
+def _profile_imports(args):
+    """
+    Return the slowest imports as a list of [module, cumulative microseconds].
+    Returns None if the frozen app does not support PYTHONPROFILEIMPORTTIME.
+    """
+    env = dict(os.environ, PYTHONPROFILEIMPORTTIME="1")
+    _, _, stderr = _run_once(args, env)
+    timings = parse_import_times(stderr)
+    if not timings:
+        return None
+    return sorted(timings.items(), key=lambda item: -item[1])[:20]
+
+
+def parse_import_times(stderr):
+    result = {}
+    for line in stderr.splitlines():
+        match = re.match(r"import time:\s*(\d+) \|\s*(\d+) \| ( *)(\S+)", line)
+        if match and not match.group(3):
+            # Only count top-level imports. Nested ones are included in their
+            # parent's cumulative time:
+            result[match.group(4)] = int(match.group(2))
+    return result
+
+
+def _summarize(values):
+    values = sorted(values)
+    # Nearest-rank percentile:
+    p95 = values[max(0, ceil(len(values) * 0.95) - 1)]
+    return {"median": median(values), "p95": p95}
+
+
+def _format_report(report):
+    lines = ["Startup over %d runs:" % report["runs"]]
+    for key, description in (("wall_time", "Time to exit"), ("max_rss", "Peak RSS")):
+        if report[key]:
+            lines.append(
+                " * %s: median %s, p95 %s"
+                % (
+                    description,
+                    _format_value(key, report[key]["median"]),
+                    _format_value(key, report[key]["p95"]),
+                )
+            )
+    if report["imports"]:
+        lines.append(" * Slowest top-level imports:")
+        for module, micros in report["imports"][:5]:
+            lines.append("    %s: %.1f ms" % (module, micros / 1000))
+    return "\n".join(lines)
+
+
+def _format_comparison(report, baseline):
+    parts = []
+    for key, description in (("wall_time", "time to exit"), ("max_rss", "peak RSS")):
+        if report[key] and baseline.get(key):
+            change = report[key]["median"] / baseline[key]["median"] - 1
+            parts.append("%s %+.1f%%" % (description, change * 100))
+    message = "Compared to the previous run: " + ", ".join(parts)
+    if report["python_optimize"] != baseline.get("python_optimize", 0):
+        message += " (python_optimize was %d, now %d)" % (
+            baseline.get("python_optimize", 0),
+            report["python_optimize"],
+        )
+    return message + "."
+
+
+def _format_value(key, value):
+    if key == "wall_time":
+        return "%.0f ms" % (value * 1000)
+    return "%.1f MB" % (value / 1024 / 1024)
@@ -1,6 +1,7 @@
 from collections import OrderedDict
 from ppt.error import PbtError
 from ppt.paths import get_build_system_dir, project_path
+from ppt.platform import is_mac, is_windows
 from getpass import getpass
 from os.path import exists
 from pathlib import Path
@@ -11,6 +12,7 @@ import re
 
 BASE_JSON = "${build_system_dir}/build/settings/base.json"
 SECRET_JSON = "${build_system_dir}/build/settings/secret.json"
+LINUX_JSON = "${build_system_dir}/build/settings/linux.json"
 
 
 def prompt_for_value(value, optional=False, default="", password=False, choices=()):
@@ -52,6 +54,14 @@ def require_frozen_app():
         )
 
 
+def get_frozen_executable():
+    if is_mac():
+        return project_path("${freeze_dir}/Contents/MacOS/${app_name}")
+    if is_windows():
+        return project_path("${freeze_dir}/${app_name}.exe")
+    return project_path("${freeze_dir}/${app_name}")
+
+
 def require_installer():
     installer = project_path("target/${installer}")
     if not exists(installer):
@@ -0,0 +1,67 @@
+from ppt import SETTINGS
+from ppt._files import hash_files, hash_tree
+from ppt.builtin_commands import clean, freeze, installer
+from ppt.builtin_commands._util import require_existing_project
+from ppt.cmdline import command
+from ppt.error import PbtError
+from ppt.paths import project_path
+from os import listdir
+from os.path import isfile, join, relpath
+
+import logging
+
+__all__ = ["verify_reproducible"]
+
+_LOG = logging.getLogger(__name__)
+
+
+@command
+def verify_reproducible():
+    """
+    Build your app and installer twice and check that the outputs are identical
+    """
+    require_existing_project()
+    builds = []
+    for i in range(2):
+        _LOG.info("Build %d of 2:", i + 1)
+        clean()
+        freeze()
+        installer()
+        builds.append(_hash_outputs())
+    differences = diff_hashes(*builds)
+    if differences:
+        message = "The two builds differ in:\n * " + "\n * ".join(differences)
+        if not SETTINGS.get("reproducible"):
+            message += '\nYou may want to set "reproducible": true.'
+        raise PbtError(message)
+    _LOG.info("Both builds produced identical outputs (%d files).", len(builds[0]))
+
+
+def diff_hashes(first, second):
+    """
+    Compare two dicts of path -> hash. Return the sorted paths that are only
+    in one of them or whose hashes differ.
+    """
+    return sorted(
+        path
+        for path in first.keys() | second.keys()
+        if first.get(path) != second.get(path)
+    )
+
+
+def _hash_outputs():
+    """
+    Hash the frozen app and the installers, ie. the files directly in target/.
+    """
+    target_dir = project_path("target")
+    freeze_dir = project_path("${freeze_dir}")
+    prefix = relpath(freeze_dir, target_dir).replace("\\", "/") + "/"
+    result = {prefix + path: digest for path, digest in hash_tree(freeze_dir).items()}
+    installers = [
+        join(target_dir, name)
+        for name in sorted(listdir(target_dir))
+        if isfile(join(target_dir, name))
+    ]
+    for path, digest in zip(installers, hash_files(installers)):
+        result[relpath(path, target_dir)] = digest
+    return result
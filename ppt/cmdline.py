@@ -29,6 +29,10 @@ def main(project_dir=None):
         from ppt.builtin_commands import _gpg
         from ppt.builtin_commands import _account
         from ppt.builtin_commands import _licensing
+        from ppt.builtin_commands import _imports
+        from ppt.builtin_commands import _profile
+        from ppt.builtin_commands import _verify
+        from ppt.builtin_commands import _delta
 
         fn, args = _parse_cmdline()
         fn(*args)
@@ -55,7 +59,7 @@ def _parse_cmdline():
     args = parser.parse_args()
     if hasattr(args, "fn"):
         fn_args = []
-        for arg in args.args[: 1 - len(args.defaults)]:
+        for arg in args.args[: len(args.args) - len(args.defaults)]:
             fn_args.append(getattr(args, arg))
         for arg, default in zip(args.args[-len(args.defaults) :], args.defaults):
             fn_args.append(getattr(args, arg, default))
@@ -77,7 +81,7 @@ def _get_cmdline_parser():
         argspec = getfullargspec(cmd_fn)
         args = argspec.args or []
         defaults = argspec.defaults or ()
-        args_without_defaults = args[: 1 - len(defaults)]
+        args_without_defaults = args[: len(args) - len(defaults)]
         args_with_defaults = args[-len(defaults) :]
         for arg in args_without_defaults:
             cmd_parser.add_argument(arg)
@@ -0,0 +1,199 @@
+"""
+Creates delta updates between releases. Each release's ${freeze_dir} is kept
+in a content-addressed history in cache/releases: Every distinct file is
+stored once, in objects/<first two hex digits>/<sha256>, and
+<version>.json lists the files of a release. A delta only contains the files
+that changed between two releases. ppt_runtime.delta applies it.
+"""
+from ppt import SETTINGS
+from ppt._files import hash_files
+from ppt.error import PbtError
+from ppt.paths import project_path
+from ppt._variables import get_version
+from ppt_runtime.delta import CODEC_XZ, CODEC_ZSTD, MANIFEST_NAME
+from os import makedirs, replace
+from os.path import basename, dirname, exists, isdir, islink, join, normpath, relpath
+from shutil import copy2
+
+import json
+import lzma
+import os
+import zipfile
+
+_RELEASES_DIR = "cache/releases"
+
+
+def record_release(version=None):
+    """
+    Add the current ${freeze_dir} to the release history. Returns the
+    release's manifest.
+    """
+    if version is None:
+        version = get_version()
+    freeze_dir = project_path("${freeze_dir}")
+    manifest = _scan(freeze_dir)
+    objects_dir = project_path(_RELEASES_DIR + "/objects")
+    for path, entry in manifest["files"].items():
+        object_path = _get_object_path(objects_dir, entry["sha256"])
+        if not exists(object_path):
+            makedirs(dirname(object_path), exist_ok=True)
+            # Copy to a temporary name first, so an interrupted copy does not
+            # leave a corrupt object behind:
+            copy2(_join(freeze_dir, path), object_path + ".tmp")
+            replace(object_path + ".tmp", object_path)
+    with open(_get_manifest_path(version), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def create_delta(old, dest_dir):
+    """
+    Create a delta from old to the current ${freeze_dir} in dest_dir. old is
+    either a version in the release history or the path of an old freeze
+    directory. Returns the path of the delta.
+    """
+    if isdir(old):
+        old_manifest = _scan(old)
+        old_version = basename(normpath(old))
+        get_old_path = lambda path, sha256: _join(old, path)
+    else:
+        try:
+            with open(_get_manifest_path(old)) as f:
+                old_manifest = json.load(f)
+        except FileNotFoundError:
+            raise PbtError(
+                "%s is neither a directory nor a release in %s." % (old, _RELEASES_DIR)
+            ) from None
+        old_version = old
+        objects_dir = project_path(_RELEASES_DIR + "/objects")
+        get_old_path = lambda path, sha256: _get_object_path(objects_dir, sha256)
+    new_version = get_version()
+    freeze_dir = project_path("${freeze_dir}")
+    new_manifest = _scan(freeze_dir)
+    codec = _get_patch_codec()
+    old_files = old_manifest["files"]
+    # Files may be moved between releases. So find them by their contents:
+    old_paths = {}
+    for path, entry in sorted(old_files.items()):
+        old_paths.setdefault(entry["sha256"], path)
+    makedirs(dest_dir, exist_ok=True)
+    dest = join(dest_dir, "%s-%s.delta.zip" % (old_version, new_version))
+    files, members = {}, set()
+    with zipfile.ZipFile(dest + ".tmp", "w", zipfile.ZIP_STORED) as archive:
+        for path, entry in sorted(new_manifest["files"].items()):
+            sha256 = entry["sha256"]
+            delta_entry = dict(entry)
+            files[path] = delta_entry
+            if sha256 in old_paths:
+                delta_entry.update(action="keep", source=old_paths[sha256])
+                continue
+            with open(_join(freeze_dir, path), "rb") as f:
+                data = f.read()
+            compressed = lzma.compress(data, preset=9 | lzma.PRESET_EXTREME)
+            delta_entry.update(action="full", codec=CODEC_XZ)
+            old_entry = old_files.get(path)
+            if codec == CODEC_ZSTD and old_entry:
+                base = get_old_path(path, old_entry["sha256"])
+                with open(base, "rb") as f:
+                    patch = _zstd_patch(f.read(), data)
+                if len(patch) < len(compressed):
+                    compressed = patch
+                    delta_entry.update(
+                        action="patch",
+                        codec=CODEC_ZSTD,
+                        source=path,
+                        base=old_entry["sha256"],
+                    )
+            member = "data/%s.%s" % (sha256, delta_entry["codec"])
+            if delta_entry["action"] == "patch":
+                # The patch also depends on its base:
+                member = "data/%s-%s.zstd" % (delta_entry["base"], sha256)
+            delta_entry["member"] = member
+            if member not in members:
+                archive.writestr(member, compressed)
+                members.add(member)
+        delta_manifest = {
+            "from": old_version,
+            "to": new_version,
+            "files": files,
+            "links": new_manifest["links"],
+            "removed": sorted(
+                set(old_files) - set(files) - set(new_manifest["links"])
+            ),
+        }
+        archive.writestr(MANIFEST_NAME, json.dumps(delta_manifest, indent=2))
+    replace(dest + ".tmp", dest)
+    return dest
+
+
+def _get_patch_codec():
+    codec = SETTINGS.get("delta_compression", CODEC_XZ)
+    if codec not in (CODEC_XZ, CODEC_ZSTD):
+        raise PbtError(
+            'Unsupported delta_compression %r. Please use "xz" or "zstd".' % codec
+        )
+    if codec == CODEC_ZSTD:
+        try:
+            import zstandard
+        except ImportError:
+            raise PbtError(
+                "delta_compression zstd requires zstandard. Maybe you need to:\n"
+                "    pip install zstandard"
+            ) from None
+    return codec
+
+
+def _zstd_patch(old_data, new_data):
+    """
+    Compress new_data with old_data as dictionary. This is what
+    `zstd --patch-from` does. The result is small when the two are similar.
+    """
+    import zstandard
+
+    dict_data = zstandard.ZstdCompressionDict(
+        old_data, dict_type=zstandard.DICT_TYPE_RAWCONTENT
+    )
+    # Like --patch-from, make the window span the dictionary and the data.
+    # ppt_runtime.delta.MAX_WINDOW_SIZE lets the decompressor accept this:
+    window_log = min(max((len(old_data) + len(new_data)).bit_length(), 20), 31)
+    params = zstandard.ZstdCompressionParameters.from_level(
+        19, window_log=window_log, enable_ldm=True
+    )
+    compressor = zstandard.ZstdCompressor(
+        dict_data=dict_data, compression_params=params
+    )
+    return compressor.compress(new_data)
+
+
+def _scan(dir_path):
+    """
+    Return a manifest of the files and symbolic links below dir_path.
+    """
+    file_paths, links = [], {}
+    for subdir, dir_names, file_names in os.walk(dir_path):
+        for name in dir_names + file_names:
+            path = join(subdir, name)
+            rel_path = relpath(path, dir_path).replace(os.sep, "/")
+            if islink(path):
+                links[rel_path] = os.readlink(path)
+            elif name in file_names:
+                file_paths.append(path)
+    files = {}
+    for path, sha256 in zip(file_paths, hash_files(file_paths)):
+        rel_path = relpath(path, dir_path).replace(os.sep, "/")
+        files[rel_path] = {"sha256": sha256, "mode": os.stat(path).st_mode & 0o777}
+    return {"files": files, "links": links}
+
+
+def _get_manifest_path(version):
+    releases_dir = project_path(_RELEASES_DIR)
+    makedirs(releases_dir, exist_ok=True)
+    return join(releases_dir, version + ".json")
+
+
+def _get_object_path(objects_dir, sha256):
+    return join(objects_dir, sha256[:2], sha256)
+
+
+def _join(root, path):
+    return join(root, *path.split("/"))
@@ -1,16 +1,31 @@
 from ppt import SETTINGS
+from ppt._fbs import write_public_settings_module
 from ppt._state import LOADED_PROFILES
-from ppt.resources import _copy
+from ppt.resources import _copy, pack_resources
 from ppt.platform import is_mac
 from ppt.paths import default_path, project_path, get_script_path
-from os import rename
-from pathlib import PurePath
-from subprocess import run
-from os.path import join, dirname
+from ppt._variables import get_source_date_epoch
+from ppt_runtime.resources import PACK_NAME
+from os import makedirs, rename, replace
+from pathlib import Path, PurePath
+from shutil import copy2, rmtree
+from subprocess import run, CalledProcessError, DEVNULL, Popen
+from os.path import join, dirname, exists, getsize, relpath
 
+import json
+import logging
+import os
 import sys
 
-def run_pyinstaller(extra_args=None, debug=False):
+_LOG = logging.getLogger(__name__)
+_STAGING_DIR = "target/resources-staging"
+
+
+def run_pyinstaller(extra_args=None, debug=False, concurrently=None):
+    """
+    Freeze the app with PyInstaller. If given, the function concurrently is
+    called while PyInstaller runs.
+    """
     if extra_args is None:
         extra_args = []
     app_name = SETTINGS["app_name"]
@@ -19,28 +34,37 @@ def run_pyinstaller(extra_args=None, debug=False):
     # "hidden import not found". So use ERROR instead.
     log_level = "DEBUG" if debug else "ERROR"
     args = [
-        "pyinstaller",
-        "--name",
-        app_name,
         "--noupx",
         "--log-level",
         log_level,
-        "--noconfirm",
     ]
     for hidden_import in SETTINGS["hidden_imports"]:
         args.extend(["--hidden-import", hidden_import])
+    for excluded_module in SETTINGS.get("excludes", []):
+        args.extend(["--exclude-module", excluded_module])
+    lazy_imports = SETTINGS.get("lazy_imports", [])
+    if lazy_imports:
+        from ppt.freeze._lazy_imports import (
+            check_lazy_imports,
+            generate_lazy_imports_hook,
+        )
+
+        check_lazy_imports(lazy_imports)
+        hook = generate_lazy_imports_hook(
+            lazy_imports, project_path("target/PyInstaller/lazy_imports_hook.py")
+        )
+        args.extend(["--runtime-hook", hook])
+    if "public_settings" in SETTINGS:
+        # Compile the public settings into the app for ppt_runtime.settings:
+        settings_dir = project_path("target/public_settings")
+        settings_module = write_public_settings_module(SETTINGS, settings_dir)
+        args.extend(["--paths", settings_dir, "--hidden-import", settings_module])
+    optimize = SETTINGS.get("python_optimize", 0)
+    if optimize:
+        args.extend(["--optimize", str(optimize)])
+        args.extend(_get_keep_docstrings_args(SETTINGS.get("keep_docstrings", [])))
     args.extend(SETTINGS.get("extra_pyinstaller_args", []))
     args.extend(extra_args)
-    args.extend(
-        [
-            "--distpath",
-            project_path("target"),
-            "--specpath",
-            project_path("target/PyInstaller"),
-            "--workpath",
-            project_path("target/PyInstaller"),
-        ]
-    )
     # It's a Python 3.10 compatibility issue, and it's mentioned https://github.com/pyinstaller/pyinstaller/issues/5693
     version = sys.version_info
     if version[0] == 3 and version[1] >= 10:
@@ -52,8 +76,37 @@ def run_pyinstaller(extra_args=None, debug=False):
             # Force generation of an .app bundle. Otherwise, PyInstaller skips
             # it when --debug is given.
             args.append("-w")
-    args.append(get_script_path()[0])
-    run(args, check=True)
+    build_args = [
+        "--noconfirm",
+        "--distpath",
+        project_path("target"),
+        "--workpath",
+        project_path("target/PyInstaller"),
+    ]
+    executables = SETTINGS.get("executables", {})
+    if executables:
+        spec_path = _generate_executables_spec(args, executables)
+        args = ["pyinstaller", "--log-level", log_level] + build_args + [spec_path]
+    else:
+        args = ["--name", app_name] + args
+        args.extend(["--specpath", project_path("target/PyInstaller")])
+        args = ["pyinstaller"] + args + build_args + [get_script_path()[0]]
+    env = None
+    if SETTINGS.get("reproducible"):
+        # Make the order of sets and dicts, and thus PyInstaller's output,
+        # the same for each build:
+        env = dict(
+            os.environ,
+            PYTHONHASHSEED="0",
+            SOURCE_DATE_EPOCH=str(get_source_date_epoch()),
+        )
+    process = Popen(args, env=env)
+    try:
+        if concurrently is not None:
+            concurrently()
+    finally:
+        if process.wait():
+            raise CalledProcessError(process.returncode, args)
     output_dir = project_path(
         "target/" + app_name + (".app" if is_mac() else ""))
     freeze_dir = project_path("${freeze_dir}")
@@ -61,23 +114,189 @@ def run_pyinstaller(extra_args=None, debug=False):
     # some Windows drives, it raises a FileExistsError. So check src != dst:
     if PurePath(output_dir) != PurePath(freeze_dir):
         rename(output_dir, freeze_dir)
+    _report_freeze(optimize)
 
 
-def _generate_resources():
+def _generate_executables_spec(args, executables):
+    """
+    Generate a .spec file that freezes the main module and the modules in the
+    "executables" setting in one PyInstaller run. There is a single Analysis
+    of all scripts, so their shared dependencies are only analyzed once. The
+    executables end up in the same directory and share their dependencies.
+    PyInstaller's command line only supports one executable. So we let
+    pyi-makespec translate the command line options into a .spec file with
+    one Analysis of all scripts and then split its EXE.
+    """
+    spec_dir = project_path("target/PyInstaller/executables")
+    entries = [(SETTINGS["app_name"], SETTINGS["main_module"])]
+    entries.extend(sorted(executables.items()))
+    scripts = [get_script_path(module_name)[0] for _, module_name in entries]
+    run(
+        ["pyi-makespec", "--name", SETTINGS["app_name"], "--specpath", spec_dir]
+        + args
+        + scripts,
+        check=True,
+        stdout=DEVNULL,
+    )
+    # Name the combined .spec file after the app, so PyInstaller's work files
+    # end up in the usual target/PyInstaller/${app_name}:
+    dest = project_path("target/PyInstaller/${app_name}.spec")
+    write_executables_spec(
+        join(spec_dir, SETTINGS["app_name"] + ".spec"),
+        [name for name, _ in entries],
+        dest,
+    )
+    return dest
+
+
+_EXECUTABLES_SPEC = """\
+# Generated by ppt from the "executables" setting. Do not edit.
+# Runs the given .spec file, whose Analysis has one script per executable.
+# Its EXE(...) is split into one EXE per script. They all go into its COLLECT.
+_SPEC = %r
+_NAMES = %r
+_exes = []
+
+
+def _exe(pyz, scripts, *args, **kwargs):
+    # Analysis puts PyInstaller's bootstrap code and the runtime hooks before
+    # the scripts, in the order they were given:
+    scripts = list(scripts)
+    common = scripts[: -len(_NAMES)]
+    for name, script in zip(_NAMES, scripts[-len(_NAMES) :]):
+        _exes.append(EXE(pyz, common + [script], *args, **dict(kwargs, name=name)))
+    return _exes[0]
+
+
+def _collect(exe, *args, **kwargs):
+    return COLLECT(*_exes, *args, **kwargs)
+
+
+with open(_SPEC, encoding="utf-8") as _f:
+    exec(_f.read(), dict(globals(), EXE=_exe, COLLECT=_collect))
+"""
+
+
+def write_executables_spec(spec_path, names, dest):
+    makedirs(dirname(dest), exist_ok=True)
+    Path(dest).write_text(_EXECUTABLES_SPEC % (spec_path, names), encoding="utf-8")
+
+
+def _get_keep_docstrings_args(module_names):
+    """
+    PyInstaller's --optimize applies to all modules. Some libraries (eg. ply)
+    need their docstrings. Collect these as source code instead of bytecode.
+    There is no command line option for this. So generate a PyInstaller hook
+    that sets the collection mode. The hook belongs to a dummy module of our
+    own to avoid overriding any hooks that ship with the libraries.
+    """
+    if not module_names:
+        return []
+    hook_module = "_ppt_keep_docstrings"
+    generated_dir = project_path("target/PyInstaller/keep_docstrings")
+    hooks_dir = join(generated_dir, "hooks")
+    makedirs(hooks_dir, exist_ok=True)
+    Path(generated_dir, hook_module + ".py").write_text("")
+    collection_mode = {name: "py" for name in module_names}
+    Path(hooks_dir, "hook-%s.py" % hook_module).write_text(
+        "module_collection_mode = %r\n" % (collection_mode,)
+    )
+    return [
+        "--paths",
+        generated_dir,
+        "--hidden-import",
+        hook_module,
+        "--additional-hooks-dir",
+        hooks_dir,
+    ]
+
+
+def _report_freeze(optimize):
+    """
+    Log the size of the frozen Python code and how it compares to the previous
+    freeze. This for instance shows the effect of the python_optimize setting.
+    """
+    pyz_path = project_path("target/PyInstaller/${app_name}/PYZ-00.pyz")
+    if not exists(pyz_path):
+        return
+    report = {"python_optimize": optimize, "pyz_size": getsize(pyz_path)}
+    # Keep the report outside target/ so it survives `ppt clean`:
+    report_path = project_path("cache/freeze_report.json")
+    try:
+        with open(report_path) as f:
+            previous = json.load(f)
+    except (FileNotFoundError, ValueError):
+        previous = None
+    message = "Frozen Python code: %.1f MB" % (report["pyz_size"] / 1024 / 1024)
+    if previous:
+        message += " (%+.1f MB compared to the previous freeze with " % (
+            (report["pyz_size"] - previous["pyz_size"]) / 1024 / 1024
+        )
+        message += "python_optimize=%d)" % previous["python_optimize"]
+    _LOG.info(message + ".")
+    makedirs(dirname(report_path), exist_ok=True)
+    with open(report_path, "w") as f:
+        json.dump(report, f)
+
+
+def _generate_resources(staged=False):
     """
     Copy the data files from ${build_system_dir}/resources to ${freeze_dir}.
     Copy the data files from ${build_system_dir}/freeze to ${freeze_dir}.
     Automatically filters files mentioned in the setting files_to_filter:
     Placeholders such as ${app_name} are automatically replaced by the
     corresponding setting in files on that list.
+    Pass staged=True if _stage_resources() already ran, eg. concurrently
+    with PyInstaller via run_pyinstaller(concurrently=_stage_resources).
     """
-    freeze_dir = project_path("${freeze_dir}")
+    if not staged:
+        _stage_resources()
+    staging_dir = project_path(_STAGING_DIR)
+    _merge_dir(staging_dir, project_path("${freeze_dir}"))
+    rmtree(staging_dir)
+
+
+def _stage_resources():
+    """
+    Assemble the files that _generate_resources() puts into ${freeze_dir} in
+    a staging directory. This does not depend on PyInstaller's output.
+    """
+    staging_dir = project_path(_STAGING_DIR)
+    if exists(staging_dir):
+        rmtree(staging_dir)
+    makedirs(staging_dir)
     if is_mac():
-        resources_dest_dir = join(freeze_dir, 'Contents', 'Resources')
+        resources_dest_dir = join(staging_dir, 'Contents', 'Resources')
     else:
-        resources_dest_dir = freeze_dir
+        resources_dest_dir = staging_dir
+    resources_dir = resources_dest_dir + '/build_system/resources'
     for path_fn in default_path, project_path:
         for profile in LOADED_PROFILES:
-            _copy(path_fn, '${build_system_dir}/resources/',
-                  resources_dest_dir + '/build_system/resources')
-            _copy(path_fn, "${build_system_dir}/freeze/" + profile, freeze_dir)
+            _copy(path_fn, '${build_system_dir}/resources/', resources_dir)
+            _copy(path_fn, "${build_system_dir}/freeze/" + profile, staging_dir)
+    if SETTINGS.get("resources_pack", False) and exists(resources_dir):
+        # Replace the loose files by a single file that the app can read via
+        # ppt_runtime.resources:
+        pack_resources(
+            resources_dir,
+            join(dirname(resources_dir), PACK_NAME),
+            SETTINGS.get("resources_pack_compression"),
+        )
+        rmtree(resources_dir)
+
+
+def _merge_dir(src_dir, dest_dir):
+    """
+    Move the files in src_dir to the same relative paths in dest_dir. Existing
+    files are overwritten.
+    """
+    for subdir, _, files in os.walk(src_dir):
+        dest_subdir = join(dest_dir, relpath(subdir, src_dir))
+        makedirs(dest_subdir, exist_ok=True)
+        for file_ in files:
+            src, dest = join(subdir, file_), join(dest_subdir, file_)
+            try:
+                replace(src, dest)
+            except OSError:
+                # Eg. when src and dest are on different file systems:
+                copy2(src, dest)
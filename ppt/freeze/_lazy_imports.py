@@ -0,0 +1,125 @@
+"""
+Support for the "lazy_imports" setting: A PyInstaller runtime hook that makes
+the listed modules load on first attribute access instead of on import.
+"""
+from ppt.paths import get_python_path, project_path
+from os import makedirs
+from os.path import dirname, join, relpath
+
+import ast
+import logging
+import os
+
+_LOG = logging.getLogger(__name__)
+
+_HOOK_TEMPLATE = '''\
+# Generated by ppt from the "lazy_imports" setting. Do not edit.
+import importlib.machinery
+import importlib.util
+import sys
+
+_LAZY_MODULES = %r
+
+
+class _LazyImportFinder:
+    @classmethod
+    def find_spec(cls, name, path=None, target=None):
+        if name not in _LAZY_MODULES:
+            return None
+        for finder in sys.meta_path:
+            if finder is cls or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        # LazyLoader requires loaders that let Python create the module. This
+        # excludes extension and built-in modules:
+        if (
+            spec.loader is None
+            or not hasattr(spec.loader, "exec_module")
+            or spec.origin in ("built-in", "frozen")
+            or isinstance(spec.loader, importlib.machinery.ExtensionFileLoader)
+        ):
+            return spec
+        spec.loader = importlib.util.LazyLoader(spec.loader)
+        return spec
+
+
+sys.meta_path.insert(0, _LazyImportFinder)
+'''
+
+
+def generate_lazy_imports_hook(module_names, dest_path):
+    """
+    Write a PyInstaller runtime hook to dest_path that loads the given modules
+    lazily.
+    """
+    makedirs(dirname(dest_path), exist_ok=True)
+    with open(dest_path, "w", encoding="utf-8") as f:
+        f.write(_HOOK_TEMPLATE % (sorted(module_names),))
+    return dest_path
+
+
+def check_lazy_imports(module_names):
+    """
+    Warn about imports in the app's source code that load one of the given
+    modules eagerly, thus defeating the "lazy_imports" setting.
+    """
+    src_dir = project_path(get_python_path())
+    for file_path, line, message in find_eager_imports(src_dir, module_names):
+        _LOG.warning(
+            "%s:%d: %s. This defeats the lazy_imports setting.",
+            relpath(file_path, src_dir),
+            line,
+            message,
+        )
+
+
+def find_eager_imports(src_dir, module_names):
+    """
+    Return a list [(file_path, line, message)] of imports in the .py files
+    below src_dir that force one of the given modules to load immediately.
+    """
+    module_names = set(module_names)
+    result = []
+    for subdir, _, files in os.walk(src_dir):
+        for file_ in sorted(files):
+            if not file_.endswith(".py"):
+                continue
+            file_path = join(subdir, file_)
+            with open(file_path, "rb") as f:
+                try:
+                    tree = ast.parse(f.read(), file_path)
+                except SyntaxError:
+                    continue
+            for node in ast.walk(tree):
+                message = _get_eager_import_message(node, module_names)
+                if message:
+                    result.append((file_path, node.lineno, message))
+    return sorted(result)
+
+
+def _get_eager_import_message(node, module_names):
+    if isinstance(node, ast.ImportFrom) and node.level == 0:
+        if node.module in module_names:
+            if any(alias.name == "*" for alias in node.names):
+                return "`from %s import *` loads %s eagerly" % (
+                    node.module,
+                    node.module,
+                )
+            return "`from %s import %s` loads %s eagerly" % (
+                node.module,
+                ", ".join(alias.name for alias in node.names),
+                node.module,
+            )
+    elif isinstance(node, ast.Import):
+        for alias in node.names:
+            parents = alias.name.split(".")[:-1]
+            for i in range(len(parents)):
+                parent = ".".join(parents[: i + 1])
+                if parent in module_names:
+                    # Importing a submodule requires the parent's __path__:
+                    return "`import %s` loads %s eagerly" % (alias.name, parent)
+    return None
@@ -1,13 +1,26 @@
-from ppt.freeze import _generate_resources, run_pyinstaller
+from ppt import SETTINGS
+from ppt._files import deduplicate_files, hash_file, is_elf
+from ppt.error import PbtError
+from ppt.freeze import _generate_resources, _stage_resources, run_pyinstaller
 from ppt.paths import project_path
+from concurrent.futures import ProcessPoolExecutor
 from glob import glob
-from os import remove
-from shutil import copy
+from itertools import repeat
+from os import makedirs, remove, replace
+from os.path import basename, dirname, exists, getsize, islink, join, relpath
+from shutil import copy, copyfile, which
+from subprocess import CalledProcessError, DEVNULL, check_call
+from tempfile import TemporaryDirectory
+
+import logging
+import os
+
+_LOG = logging.getLogger(__name__)
 
 
 def freeze_linux(debug=False):
-    run_pyinstaller(debug=debug)
-    _generate_resources()
+    run_pyinstaller(debug=debug, concurrently=_stage_resources)
+    _generate_resources(staged=True)
     copy(
         project_path("${build_system_dir}/icons/Icon.ico"),
         project_path("${freeze_dir}"),
@@ -21,9 +34,117 @@ def freeze_linux(debug=False):
     remove_shared_libraries(
         "libstdc++.so.*", "libtinfo.so.*", "libreadline.so.*", "libdrm.so.*"
     )
+    if SETTINGS.get("strip_binaries", False):
+        strip_binaries(split_debug=SETTINGS.get("split_debug", False))
+    if SETTINGS.get("dedupe_files", False):
+        # Run this last because the steps above modify files in place, which
+        # would also modify any hard links to them:
+        saved = deduplicate_files(project_path("${freeze_dir}"))
+        _LOG.info(
+            "Replaced duplicate files by hard links, saving %.1f MB.",
+            saved / 1024 / 1024,
+        )
 
 
 def remove_shared_libraries(*filename_patterns):
     for pattern in filename_patterns:
         for file_path in glob(project_path("${freeze_dir}/" + pattern)):
             remove(file_path)
+
+
+def strip_binaries(split_debug=False):
+    """
+    Remove unneeded symbols from the shared libraries in ${freeze_dir}. When
+    split_debug is True, the debug information is kept in target/debug.
+    Results are cached by file hash in cache/stripped, so unchanged libraries
+    are not stripped again on the next freeze.
+    """
+    # Check this up front. Otherwise, the workers fail with FileNotFoundError:
+    for tool in ["strip"] + (["objcopy"] if split_debug else []):
+        if not which(tool):
+            raise PbtError(
+                "ppt could not find executable '%s'. Please install binutils or "
+                "disable the setting strip_binaries." % tool
+            )
+    freeze_dir = project_path("${freeze_dir}")
+    debug_dir = project_path("target/debug") if split_debug else None
+    to_strip = []
+    for subdir, _, files in os.walk(freeze_dir):
+        for file_ in files:
+            file_path = join(subdir, file_)
+            # PyInstaller's executables carry the app's archive. Leave them
+            # alone and only strip shared libraries:
+            if ".so" in file_ and not islink(file_path) and is_elf(file_path):
+                to_strip.append(file_path)
+    debug_paths = [
+        join(debug_dir, relpath(p, freeze_dir) + ".debug") if debug_dir else None
+        for p in to_strip
+    ]
+    cache_dir = project_path("cache/stripped")
+    makedirs(cache_dir, exist_ok=True)
+    with ProcessPoolExecutor() as executor:
+        results = list(
+            executor.map(_strip_file, to_strip, debug_paths, repeat(cache_dir))
+        )
+    saved = 0
+    for file_path, result in zip(to_strip, results):
+        if result is None:
+            _LOG.warning("Could not strip %s.", relpath(file_path, freeze_dir))
+        else:
+            saved += result
+    _LOG.info(
+        "Stripped %d shared libraries, saving %.1f MB.",
+        len(to_strip),
+        saved / 1024 / 1024,
+    )
+
+
+def _strip_file(file_path, debug_path, cache_dir):
+    """
+    Runs in a worker process. Returns the number of bytes saved, or None if
+    stripping failed.
+    """
+    name = basename(file_path)
+    key = hash_file(file_path)
+    if debug_path:
+        # The debug link embeds the file name, so it is part of the key:
+        key += "-" + name
+    cached = join(cache_dir, key)
+    if not exists(cached):
+        with TemporaryDirectory(dir=cache_dir) as tmp_dir:
+            tmp_path = join(tmp_dir, name)
+            copyfile(file_path, tmp_path)
+            try:
+                if debug_path:
+                    check_call(
+                        ["objcopy", "--only-keep-debug", name, name + ".debug"],
+                        cwd=tmp_dir,
+                        stdout=DEVNULL,
+                        stderr=DEVNULL,
+                    )
+                check_call(
+                    ["strip", "--strip-unneeded", name],
+                    cwd=tmp_dir,
+                    stdout=DEVNULL,
+                    stderr=DEVNULL,
+                )
+                if debug_path:
+                    check_call(
+                        ["objcopy", "--add-gnu-debuglink=" + name + ".debug", name],
+                        cwd=tmp_dir,
+                        stdout=DEVNULL,
+                        stderr=DEVNULL,
+                    )
+            except CalledProcessError:
+                return None
+            if debug_path:
+                replace(tmp_path + ".debug", cached + ".debug")
+            # Move the stripped file into place last. Its existence marks the
+            # cache entry as complete:
+            replace(tmp_path, cached)
+    size_before = getsize(file_path)
+    copyfile(cached, file_path)
+    if debug_path:
+        makedirs(dirname(debug_path), exist_ok=True)
+        copyfile(cached + ".debug", debug_path)
+    return size_before - getsize(file_path)
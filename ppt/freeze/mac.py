@@ -1,5 +1,5 @@
 from ppt import SETTINGS
-from ppt.freeze import _generate_resources, run_pyinstaller
+from ppt.freeze import _generate_resources, _stage_resources, run_pyinstaller
 from ppt.resources import get_icons
 from ppt.paths import project_path
 from os import makedirs, unlink, rename, symlink
@@ -19,10 +19,10 @@ def freeze_mac(debug=False):
     bundle_identifier = SETTINGS["mac_bundle_identifier"]
     if bundle_identifier:
         args.extend(["--osx-bundle-identifier", bundle_identifier])
-    run_pyinstaller(args, debug)
+    run_pyinstaller(args, debug, concurrently=_stage_resources)
     _remove_unwanted_pyinstaller_files()
     _fix_sparkle_delta_updates()
-    _generate_resources()
+    _generate_resources(staged=True)
 
 
 def _generate_iconset():
@@ -1,5 +1,5 @@
 from ppt import SETTINGS
-from ppt.freeze import run_pyinstaller, _generate_resources
+from ppt.freeze import run_pyinstaller, _generate_resources, _stage_resources
 from ppt.resources import _copy
 from ppt.paths import default_path, project_path
 from os.path import join, exists
@@ -24,8 +24,8 @@ def freeze_windows(debug=False):
             project_path("target/PyInstaller"),
         )
     args.extend(["--version-file", project_path("target/PyInstaller/version_info.py")])
-    run_pyinstaller(args, debug)
-    _generate_resources()
+    run_pyinstaller(args, debug, concurrently=_stage_resources)
+    _generate_resources(staged=True)
     copy(
         project_path("${build_system_dir}/icons/Icon.ico"),
         project_path("${freeze_dir}"),
@@ -5,6 +5,9 @@ from subprocess import run
 
 def create_installer_arch():
     generate_installer_files()
-    # Avoid pacman warning "directory permissions differ" when installing:
+    # Avoid pacman warning "directory permissions differ" when installing.
+    # The staged files may be hard links to ${freeze_dir}, so this also affects
+    # the permissions there. But it only removes group write permissions,
+    # which does not matter for the frozen app:
     run(["chmod", "g-w", "-R", project_path("target/installer")], check=True)
     run_fpm("pacman")
@@ -0,0 +1,186 @@
+"""
+Compression codecs for the Linux package builders. Where possible, this uses
+the multithreaded command line tools xz and zstd. Otherwise, it falls back to
+Python's own (single-threaded) modules.
+"""
+from ppt.error import PbtError
+from contextlib import contextmanager
+from os import walk
+from os.path import getsize, join
+from shutil import copyfileobj, which
+from subprocess import CalledProcessError, Popen, PIPE, check_call
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+import bz2
+import gzip
+import lzma
+
+CODECS = ("gzip", "bzip2", "xz", "zstd")
+EXTENSIONS = {"gzip": "gz", "bzip2": "bz2", "xz": "xz", "zstd": "zst"}
+DEFAULT_LEVELS = {"gzip": 9, "bzip2": 9, "xz": 6, "zstd": 19}
+BENCHMARK_LEVELS = {
+    "gzip": (6, 9),
+    "bzip2": (9,),
+    "xz": (1, 6, 9),
+    "zstd": (3, 10, 19),
+}
+
+
+def compress_file(src_path, dest_path, codec, level=None):
+    level = _check_codec(codec, level)
+    if codec in ("xz", "zstd") and which(codec):
+        # -T0 uses as many threads as there are cores:
+        with open(src_path, "rb") as src, open(dest_path, "wb") as dest:
+            check_call(
+                [codec, "-T0", "-%d" % level, "-c", "-q"], stdin=src, stdout=dest
+            )
+        return
+    with open(src_path, "rb") as src, _open(dest_path, codec, level) as dest:
+        copyfileobj(src, dest, 1024 * 1024)
+
+
+@contextmanager
+def open_compressed(dest_path, codec, level=None):
+    """
+    Return a writable binary stream whose data ends up compressed in
+    dest_path. This avoids writing the uncompressed data to disk first.
+    """
+    level = _check_codec(codec, level)
+    if codec in ("xz", "zstd") and which(codec):
+        args = [codec, "-T0", "-%d" % level, "-c", "-q"]
+        with open(dest_path, "wb") as dest:
+            process = Popen(args, stdin=PIPE, stdout=dest)
+            try:
+                yield process.stdin
+            finally:
+                process.stdin.close()
+                if process.wait():
+                    raise CalledProcessError(process.returncode, args)
+        return
+    with _open(dest_path, codec, level) as dest:
+        yield dest
+
+
+def _check_codec(codec, level):
+    """
+    Raise a PbtError if codec is not supported. Returns the level to use.
+    """
+    if codec not in CODECS:
+        raise PbtError(
+            "Unsupported compression %r. Please use one of: %s"
+            % (codec, ", ".join(CODECS))
+        )
+    return DEFAULT_LEVELS[codec] if level is None else level
+
+
+def decompress_file(src_path, dest_path, codec):
+    if codec in ("xz", "zstd") and which(codec):
+        with open(src_path, "rb") as src, open(dest_path, "wb") as dest:
+            check_call([codec, "-d", "-c", "-q"], stdin=src, stdout=dest)
+        return
+    with _open(src_path, codec, None, "rb") as src, open(dest_path, "wb") as dest:
+        copyfileobj(src, dest, 1024 * 1024)
+
+
+def is_available(codec):
+    if codec != "zstd" or which("zstd"):
+        return True
+    try:
+        import zstandard
+    except ImportError:
+        return False
+    return True
+
+
+def benchmark_compression(dir_path, sample_size, bandwidth, codecs=CODECS):
+    """
+    Compress and decompress a sample of the files in dir_path with each of the
+    given codecs that is available, at each level in BENCHMARK_LEVELS. Returns
+    a list of dicts sorted by "cost": The estimated seconds for compressing
+    the sample, downloading the result at bandwidth bytes/s and decompressing
+    it again.
+    """
+    with TemporaryDirectory() as tmp_dir:
+        sample_path = join(tmp_dir, "sample")
+        actual_size = _write_sample(dir_path, sample_path, sample_size)
+        if not actual_size:
+            raise PbtError("There are no files to sample in " + dir_path)
+        compressed_path = join(tmp_dir, "compressed")
+        decompressed_path = join(tmp_dir, "decompressed")
+        result = []
+        for codec in codecs:
+            if not is_available(codec):
+                continue
+            for level in BENCHMARK_LEVELS[codec]:
+                start = perf_counter()
+                compress_file(sample_path, compressed_path, codec, level)
+                compress_time = perf_counter() - start
+                start = perf_counter()
+                decompress_file(compressed_path, decompressed_path, codec)
+                decompress_time = perf_counter() - start
+                size = getsize(compressed_path)
+                result.append(
+                    {
+                        "codec": codec,
+                        "level": level,
+                        "ratio": actual_size / size,
+                        "compress_time": compress_time,
+                        "decompress_time": decompress_time,
+                        "cost": compress_time + size / bandwidth + decompress_time,
+                    }
+                )
+    return sorted(result, key=lambda r: r["cost"])
+
+
+def _write_sample(dir_path, dest_path, sample_size):
+    """
+    Concatenate files from dir_path into dest_path until sample_size bytes are
+    reached. Takes every n-th file, so the sample represents the whole
+    directory rather than its first few subdirectories. Returns the size of
+    the sample.
+    """
+    file_paths = sorted(
+        join(subdir, f) for subdir, _, files in walk(dir_path) for f in files
+    )
+    total_size = sum(getsize(p) for p in file_paths)
+    step = max(1, round(total_size / sample_size)) if sample_size else 1
+    written = 0
+    with open(dest_path, "wb") as dest:
+        for file_path in file_paths[::step]:
+            with open(file_path, "rb") as src:
+                data = src.read(sample_size - written)
+            dest.write(data)
+            written += len(data)
+            if written >= sample_size:
+                break
+    return written
+
+
+def _open(path, codec, level, mode="wb"):
+    if mode == "rb":
+        if codec == "gzip":
+            return gzip.open(path, "rb")
+        if codec == "bzip2":
+            return bz2.open(path, "rb")
+        if codec == "xz":
+            return lzma.open(path, "rb")
+    elif codec == "gzip":
+        # mtime=0 makes the output deterministic:
+        return gzip.GzipFile(path, "wb", compresslevel=level, mtime=0)
+    elif codec == "bzip2":
+        return bz2.open(path, "wb", compresslevel=level)
+    elif codec == "xz":
+        return lzma.open(path, "wb", preset=level)
+    try:
+        import zstandard
+    except ImportError:
+        raise PbtError(
+            "zstd compression requires either the zstd command line tool or "
+            "the Python package zstandard. Maybe you need to:\n"
+            "    pip install zstandard"
+        ) from None
+    if mode == "rb":
+        return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"))
+    compressor = zstandard.ZstdCompressor(level=level, threads=-1)
+    return compressor.stream_writer(open(path, "wb"), closefd=True)
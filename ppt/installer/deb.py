@@ -0,0 +1,240 @@
+"""
+A built-in alternative to fpm for creating .deb packages. Enable it via the
+setting "deb_backend": "native".
+"""
+from ppt import SETTINGS
+from ppt.error import PbtError
+from ppt.installer.compression import EXTENSIONS, open_compressed
+from ppt.installer.linux import get_depends
+from ppt.paths import project_path
+from ppt._variables import get_source_date_epoch, get_version
+from io import BytesIO
+from os import makedirs, remove
+from os.path import exists, getsize, join, relpath
+from shutil import copyfileobj, rmtree, which
+from subprocess import check_output
+
+import hashlib
+import os
+import platform
+import tarfile
+
+_AR_MAGIC = b"!<arch>\n"
+_AR_HEADER = "%-16s%-12d%-6d%-6d%-8o%-10d`\n"
+_ARCHITECTURES = {"x86_64": "amd64", "aarch64": "arm64", "i686": "i386"}
+
+
+def create_deb(dest=None):
+    """
+    Create target/${installer} (or dest) from target/installer, using the same
+    settings as run_fpm("deb").
+    """
+    if dest is None:
+        dest = project_path("target/${installer}")
+    if exists(dest):
+        remove(dest)
+    author = SETTINGS["author"]
+    if SETTINGS["author_email"]:
+        maintainer = "%s <%s>" % (author, SETTINGS["author_email"])
+    else:
+        maintainer = author
+    control = {
+        # Debian tools don't do well with capital letters in package names:
+        "Package": SETTINGS["app_name"].lower(),
+        "Version": get_version(),
+        "Architecture": _get_architecture(),
+        "Maintainer": maintainer,
+        "Vendor": author,
+        "Section": "misc",
+        "Priority": "optional",
+        "Depends": ", ".join(get_depends("deb")),
+        "Homepage": SETTINGS["url"],
+        "Description": SETTINGS["description"] or "no description given",
+    }
+    write_deb(
+        dest,
+        project_path("target/installer"),
+        control,
+        SETTINGS.get("installer_compression", "xz"),
+        SETTINGS.get("installer_compression_level"),
+        get_source_date_epoch(),
+    )
+
+
+def write_deb(dest, root_dir, control, compression="xz", level=None, mtime=None):
+    """
+    Write a .deb package with the files in root_dir to dest. control is a dict
+    of control fields; Empty values are omitted and Installed-Size is added.
+    Entries are sorted and owned by root. If mtime is given, it is used for all
+    entries, which makes the output reproducible.
+    """
+    build_dir = dest + ".build"
+    if exists(build_dir):
+        rmtree(build_dir)
+    makedirs(build_dir)
+    try:
+        data_member = "data.tar." + EXTENSIONS[compression]
+        data_path = join(build_dir, data_member)
+        with open_compressed(data_path, compression, level) as data_tar:
+            md5s, installed_size = _write_tar(data_tar, root_dir, mtime)
+        control = dict(control)
+        control["Installed-Size"] = str((installed_size + 1023) // 1024)
+        md5sums = "".join("%s  %s\n" % (md5, f) for f, md5 in md5s)
+        control_tar = join(build_dir, "control.tar.gz")
+        with tarfile.open(control_tar, "w:gz", format=tarfile.GNU_FORMAT) as tar:
+            tar.addfile(_tar_dir_info(".", mtime))
+            for name, contents in (
+                ("control", format_control(control)),
+                ("md5sums", md5sums),
+            ):
+                data = contents.encode("utf-8")
+                info = tarfile.TarInfo("./" + name)
+                info.size = len(data)
+                info.mode = 0o644
+                info.mtime = 0 if mtime is None else mtime
+                info.uname = info.gname = "root"
+                tar.addfile(info, BytesIO(data))
+        with open(dest, "wb") as f:
+            f.write(_AR_MAGIC)
+            ar_mtime = 0 if mtime is None else mtime
+            _write_ar_member(f, "debian-binary", BytesIO(b"2.0\n"), 4, ar_mtime)
+            for member in ("control.tar.gz", data_member):
+                path = join(build_dir, member)
+                with open(path, "rb") as member_file:
+                    _write_ar_member(f, member, member_file, getsize(path), ar_mtime)
+    finally:
+        rmtree(build_dir)
+
+
+def read_deb_control(deb_path):
+    """
+    Return the control file of the given .deb package as a dict.
+    """
+    for name, data in _read_ar_members(deb_path):
+        if name.startswith("control.tar"):
+            with tarfile.open(fileobj=BytesIO(data)) as tar:
+                for member in tar.getmembers():
+                    if member.name in ("./control", "control"):
+                        contents = tar.extractfile(member).read().decode("utf-8")
+                        return parse_control(contents)
+    raise PbtError("Could not find the control file in " + deb_path)
+
+
+def parse_control(contents):
+    result = {}
+    key = None
+    for line in contents.splitlines():
+        if line.startswith((" ", "\t")) and key:
+            result[key] += "\n" + line
+        elif ":" in line:
+            key, value = line.split(":", 1)
+            result[key] = value.strip()
+    return result
+
+
+def _write_tar(fileobj, root_dir, mtime):
+    """
+    Stream the contents of root_dir as an uncompressed tar in sorted order to
+    fileobj. Hashes the regular files while they are being written. Returns
+    a list of their relative paths and MD5 digests, and their total size.
+    """
+    md5s = []
+    installed_size = 0
+    # The digests of files that are hard links of each other:
+    inode_md5s = {}
+    with tarfile.open(fileobj=fileobj, mode="w|", format=tarfile.GNU_FORMAT) as tar:
+        tar.addfile(_tar_dir_info(".", mtime))
+        for subdir, dir_names, file_names in os.walk(root_dir):
+            dir_names.sort()
+            for name in sorted(dir_names + file_names):
+                path = join(subdir, name)
+                rel_path = relpath(path, root_dir).replace(os.sep, "/")
+                # tarfile stores files that are hard links of each other as
+                # links in the archive:
+                info = tar.gettarinfo(path, "./" + rel_path)
+                info.uid = info.gid = 0
+                info.uname = info.gname = "root"
+                if mtime is not None:
+                    info.mtime = mtime
+                stat = os.lstat(path)
+                inode = stat.st_dev, stat.st_ino
+                if info.isreg():
+                    with open(path, "rb") as f:
+                        reader = _HashingReader(f)
+                        tar.addfile(info, reader)
+                    inode_md5s[inode] = reader.hexdigest()
+                else:
+                    tar.addfile(info)
+                if info.isreg() or info.islnk():
+                    md5s.append((rel_path, inode_md5s[inode]))
+                    installed_size += stat.st_size
+    return md5s, installed_size
+
+
+class _HashingReader:
+    """
+    Computes the MD5 of the data that tarfile reads from the wrapped file.
+    """
+
+    def __init__(self, fileobj):
+        self._fileobj = fileobj
+        self._md5 = hashlib.md5()
+
+    def read(self, size=-1):
+        data = self._fileobj.read(size)
+        self._md5.update(data)
+        return data
+
+    def hexdigest(self):
+        return self._md5.hexdigest()
+
+
+def _tar_dir_info(name, mtime):
+    info = tarfile.TarInfo(name)
+    info.type = tarfile.DIRTYPE
+    info.mode = 0o755
+    info.mtime = 0 if mtime is None else mtime
+    info.uname = info.gname = "root"
+    return info
+
+
+def format_control(control):
+    lines = []
+    for key, value in control.items():
+        if not value:
+            continue
+        value_lines = value.strip().split("\n")
+        lines.append("%s: %s" % (key, value_lines[0]))
+        # Continuation lines must be indented. Empty ones are written as " .":
+        lines.extend(" " + (line.strip() or ".") for line in value_lines[1:])
+    return "\n".join(lines) + "\n"
+
+
+def _write_ar_member(f, name, fileobj, size, mtime):
+    header = _AR_HEADER % (name, mtime, 0, 0, 0o100644, size)
+    f.write(header.encode("ascii"))
+    copyfileobj(fileobj, f)
+    if size % 2:
+        f.write(b"\n")
+
+
+def _read_ar_members(path):
+    with open(path, "rb") as f:
+        if f.read(len(_AR_MAGIC)) != _AR_MAGIC:
+            raise PbtError(path + " is not a .deb package")
+        while True:
+            header = f.read(60)
+            if len(header) < 60:
+                return
+            name = header[:16].decode("ascii").strip().rstrip("/")
+            size = int(header[48:58])
+            yield name, f.read(size)
+            if size % 2:
+                f.read(1)
+
+
+def _get_architecture():
+    if which("dpkg"):
+        return check_output(["dpkg", "--print-architecture"], text=True).strip()
+    machine = platform.machine()
+    return _ARCHITECTURES.get(machine, machine)
@@ -1,19 +1,48 @@
 from ppt import SETTINGS
+from ppt._files import link_tree, set_mtimes
 from ppt.installer import _generate_installer_resources
+from ppt.installer.compression import CODECS, EXTENSIONS
 from ppt.resources import get_icons
-from ppt.platform import is_arch_linux
+from ppt.error import PbtError
 from ppt.paths import project_path
-from ppt._variables import get_version
+from ppt._variables import get_source_date_epoch, get_version
+from concurrent.futures import ThreadPoolExecutor
 from os import makedirs, remove, rename
 from os.path import join, dirname, exists
-from shutil import copy, rmtree, copytree
+from shutil import copy, rmtree
 from subprocess import run, DEVNULL
 
+import logging
+
+_LOG = logging.getLogger(__name__)
+
+# How fpm calls our codecs for each output type. None means not supported:
+_FPM_COMPRESSION = {
+    "deb": {"gzip": "gz", "bzip2": "bzip2", "xz": "xz", "zstd": "zst"},
+    # xzmt is multithreaded xz:
+    "rpm": {"gzip": "gzip", "bzip2": "bzip2", "xz": "xzmt", "zstd": None},
+    "pacman": {"gzip": "gz", "bzip2": "bzip2", "xz": "xz", "zstd": "zstd"},
+}
+# Codecs packages should not use even though fpm supports them. dpkg only
+# supports zstd since 1.21.18, eg. not on Ubuntu 20.04 or Debian 11:
+_INCOMPATIBLE_CODECS = {"deb": ("zstd",)}
+INSTALLER_NAMES = {
+    "deb": "${app_name}.deb",
+    "rpm": "${app_name}.rpm",
+    # See get_pacman_extension():
+    "pacman": "${app_name}",
+}
+
 
 def generate_installer_files():
     if exists(project_path("target/installer")):
         rmtree(project_path("target/installer"))
-    copytree(
+    # Link the frozen app's files instead of copying them. This also preserves
+    # hard links created by the "dedupe_files" setting. fpm keeps those, so
+    # they shrink the package. Installer resources that overwrite files below
+    # opt/${app_name} replace the links instead of writing through them. See
+    # copy_with_filtering(...):
+    link_tree(
         project_path("${freeze_dir}"), project_path("target/installer/opt/${app_name}")
     )
     _generate_installer_resources()
@@ -24,10 +53,115 @@ def generate_installer_files():
         join(apps_dir, SETTINGS["app_name"] + ".desktop"),
     )
     _generate_icons()
+    if SETTINGS.get("reproducible"):
+        # This also sets the times of the linked files in ${freeze_dir}. But
+        # freeze() already set them to the same value there:
+        set_mtimes(project_path("target/installer"), get_source_date_epoch())
+
+
+def create_installers(formats):
+    """
+    Package target/installer in each of the given formats ("deb", "rpm",
+    "pacman") concurrently. Returns the paths of the created packages.
+    """
+    unsupported = sorted(set(formats) - set(INSTALLER_NAMES))
+    if unsupported:
+        raise PbtError(
+            "Unsupported installer_formats: %s. Please use one of: %s"
+            % (", ".join(unsupported), ", ".join(INSTALLER_NAMES))
+        )
+    if "pacman" in formats:
+        # See create_installer_arch(...). This has to happen before any of the
+        # packages are built because they all read the same files. Like there,
+        # it also removes group write permissions in ${freeze_dir}:
+        run(["chmod", "g-w", "-R", project_path("target/installer")], check=True)
+    dests = [get_installer_path(output_type) for output_type in formats]
+    with ThreadPoolExecutor() as executor:
+        # list(...) re-raises any exceptions:
+        list(executor.map(_create_package, formats, dests))
+    return dests
+
+
+def get_supported_codecs(formats):
+    """
+    Return the codecs that all of the given output types support.
+    """
+    return [
+        codec
+        for codec in CODECS
+        if all(
+            _FPM_COMPRESSION[output_type].get(codec)
+            and codec not in _INCOMPATIBLE_CODECS.get(output_type, ())
+            for output_type in formats
+        )
+    ]
+
+
+def check_compression(codec, formats):
+    if codec not in get_supported_codecs(formats):
+        raise PbtError(
+            "%s compression is not supported for: %s"
+            % (codec, ", ".join(sorted(formats)))
+        )
+
+
+def rename_pacman_installer(installer, codec):
+    """
+    Return the given value of the "installer" setting with the extension that
+    pacman expects for codec. See get_pacman_extension().
+    """
+    if ".pkg.tar" not in installer:
+        return installer
+    return installer[: installer.index(".pkg.tar")] + ".pkg.tar." + EXTENSIONS[codec]
+
 
+def get_installer_path(output_type):
+    name = INSTALLER_NAMES[output_type]
+    if output_type == "pacman":
+        name += get_pacman_extension()
+    return project_path("target/" + name)
 
-def run_fpm(output_type):
-    dest = project_path("target/${installer}")
+
+def get_pacman_extension():
+    """
+    pacman recognizes the compression of a package by its extension. So it
+    depends on the "installer_compression" setting.
+    """
+    return ".pkg.tar." + EXTENSIONS[_get_pacman_compression()]
+
+
+def _get_pacman_compression():
+    return SETTINGS.get("installer_compression") or "xz"
+
+
+def get_depends(output_type):
+    """
+    The "depends" setting names the packages of the distribution ppt runs on.
+    When building for other distributions via "installer_formats", their
+    package names can be given as "depends_deb", "depends_rpm" and
+    "depends_pacman".
+    """
+    return SETTINGS.get("depends_" + output_type, SETTINGS["depends"])
+
+
+def _create_package(output_type, dest):
+    if output_type == "deb" and SETTINGS.get("deb_backend", "fpm") == "native":
+        from ppt.installer.deb import create_deb
+
+        create_deb(dest)
+    else:
+        run_fpm(output_type, dest)
+
+
+def run_fpm(output_type, dest=None):
+    if dest is None:
+        dest = project_path("target/${installer}")
+    if output_type == "pacman" and not dest.endswith(get_pacman_extension()):
+        raise PbtError(
+            "With installer_compression %s, the pacman package must end with "
+            "%s. Please change the setting 'installer' accordingly."
+            % (_get_pacman_compression(), get_pacman_extension())
+        )
     if exists(dest):
         remove(dest)
     # Lower-case the name to avoid the following fpm warning:
@@ -67,10 +201,14 @@ def run_fpm(output_type):
         args.extend(["-m", "%s <%s>" % (SETTINGS["author"], SETTINGS["author_email"])])
     if SETTINGS["url"]:
         args.extend(["--url", SETTINGS["url"]])
-    for dependency in SETTINGS["depends"]:
+    args.extend(_get_fpm_compression_args(output_type))
+    source_date_epoch = get_source_date_epoch()
+    if source_date_epoch is not None:
+        args.extend(["--source-date-epoch-default", str(source_date_epoch)])
+    for dependency in get_depends(output_type):
         args.extend(["-d", dependency])
-    if is_arch_linux():
-        for opt_dependency in SETTINGS["depends_opt"]:
+    if output_type == "pacman":
+        for opt_dependency in SETTINGS.get("depends_opt", []):
             args.extend(["--pacman-optional-depends", opt_dependency])
     try:
         run(args, check=True, stdout=DEVNULL)
@@ -82,6 +220,28 @@ def run_fpm(output_type):
         ) from None
 
 
+def _get_fpm_compression_args(output_type):
+    codec = SETTINGS.get("installer_compression")
+    if output_type == "pacman":
+        # Always pass the codec, so it matches the package's extension:
+        codec = _get_pacman_compression()
+    if not codec or output_type not in _FPM_COMPRESSION:
+        return []
+    fpm_codec = _FPM_COMPRESSION[output_type].get(codec)
+    if fpm_codec is None:
+        _LOG.warning(
+            "fpm does not support %s compression for %s. Using its default.",
+            codec,
+            output_type,
+        )
+        return []
+    result = ["--%s-compression" % output_type, fpm_codec]
+    level = SETTINGS.get("installer_compression_level")
+    if level is not None and output_type in ("deb", "rpm"):
+        result.extend(["--%s-compression-level" % output_type, str(level)])
+    return result
+
+
 def _generate_icons():
     dest_root = project_path("target/installer/usr/share/icons/hicolor")
     makedirs(dest_root)
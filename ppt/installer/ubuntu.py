@@ -1,6 +1,11 @@
+from ppt import SETTINGS
+from ppt.installer.deb import create_deb
 from ppt.installer.linux import generate_installer_files, run_fpm
 
 
 def create_installer_ubuntu():
     generate_installer_files()
-    run_fpm("deb")
+    if SETTINGS.get("deb_backend", "fpm") == "native":
+        create_deb()
+    else:
+        run_fpm("deb")
@@ -1,18 +1,74 @@
+from ppt import SETTINGS
+from ppt._files import hash_tree
+from ppt.error import PbtError
 from ppt.paths import project_path
 from ppt.installer import _generate_installer_resources
+from os.path import exists
+from pathlib import Path
 from subprocess import check_call, DEVNULL
 
+import hashlib
+import json
+import logging
+
+_LOG = logging.getLogger(__name__)
+_COMPRESSORS = ("zlib", "bzip2", "lzma")
+_FINGERPRINT_PATH = "target/installer/.fingerprint"
+
 
 def create_installer_windows():
     _generate_installer_resources()
+    args = ["makensis"] + _get_compression_args() + ["Installer.nsi"]
+    fingerprint = _get_fingerprint(args)
+    fingerprint_path = project_path(_FINGERPRINT_PATH)
+    if exists(project_path("target/${installer}")) and exists(fingerprint_path):
+        if Path(fingerprint_path).read_text() == fingerprint:
+            _LOG.info("Skipping makensis: The frozen app and .nsi are unchanged.")
+            return
     try:
-        check_call(
-            ["makensis", "Installer.nsi"],
-            cwd=project_path("target/installer"),
-            stdout=DEVNULL,
-        )
+        check_call(args, cwd=project_path("target/installer"), stdout=DEVNULL)
     except FileNotFoundError:
         raise FileNotFoundError(
             "ppt could not find executable 'makensis'. Please install NSIS and "
             "add its installation directory to your PATH environment variable."
         ) from None
+    Path(fingerprint_path).write_text(fingerprint)
+
+
+def _get_compression_args():
+    """
+    Translate the nsis_* settings into NSIS commands. They are passed via -X,
+    which makensis accepts on all platforms, so that they also apply to custom
+    Installer.nsi files. /FINAL makes them take precedence over any
+    SetCompressor in the script.
+    """
+    result = []
+    compressor = SETTINGS.get("nsis_compressor")
+    if compressor:
+        if compressor not in _COMPRESSORS:
+            raise PbtError(
+                "Unsupported nsis_compressor %r. Please use one of: %s"
+                % (compressor, ", ".join(_COMPRESSORS))
+            )
+        solid = "/SOLID " if SETTINGS.get("nsis_solid", True) else ""
+        result.append("-XSetCompressor %s/FINAL %s" % (solid, compressor))
+    dict_size = SETTINGS.get("nsis_dict_size")
+    if dict_size:
+        # In MB. Only used by lzma:
+        result.append("-XSetCompressorDictSize %d" % dict_size)
+    return result
+
+
+def _get_fingerprint(args):
+    """
+    Hash everything the installer is built from: The frozen app, the filtered
+    Installer.nsi and the makensis command line.
+    """
+    nsi_path = project_path("target/installer/Installer.nsi")
+    inputs = {
+        "args": args,
+        "freeze_dir": hash_tree(project_path("${freeze_dir}")),
+        "nsi": hashlib.sha256(Path(nsi_path).read_bytes()).hexdigest(),
+    }
+    data = json.dumps(inputs, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
@@ -1,7 +1,7 @@
 import os
 import json
 from os.path import join, normpath, dirname, exists
-from typing import Tuple
+from typing import Optional, Tuple
 from multiprocessing import Value, Array, Process
 from ctypes import c_char, c_bool
 import re
@@ -69,18 +69,21 @@ def _find_script_path(
 
 
 @lru_cache
-def get_script_path() -> Tuple[str, bool]:
+def get_script_path(module_name: Optional[str] = None) -> Tuple[str, bool]:
     """
     Get the path of the python main script.
     This is the path that is executed in `ppt run` and passed to pyinstaller in `ppt freeze`
     Returns the path to the script and a bool. True if sys.path needs to be modified.
+    module_name defaults to the main_module setting.
     """
+    if module_name is None:
+        module_name = SETTINGS["main_module"]
     script_path = Array(c_char, b"\x00" * 2**15)
     python_path_needed = Value(c_bool, 0)
     p = Process(
         target=_find_script_path,
         args=(
-            SETTINGS["main_module"],
+            module_name,
             project_path(get_python_path()),
             script_path,
             python_path_needed,
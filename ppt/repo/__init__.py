@@ -0,0 +1,82 @@
+from ppt import SETTINGS
+from ppt.error import PbtError
+from ppt.paths import project_path
+from ppt._variables import get_version
+from datetime import date
+from os import makedirs, remove
+from os.path import dirname, exists, isdir, join
+from packaging.version import Version
+from shutil import rmtree
+
+import json
+import logging
+
+_LOG = logging.getLogger(__name__)
+# The versions in the repository, and the files each one added:
+_VERSIONS_PATH = "cache/repo_versions.json"
+
+
+def get_repo_dir():
+    """
+    The repository is kept outside target/, so `ppt clean` doesn't delete it.
+    Each `ppt repo` adds the current installer to it.
+    """
+    return project_path(SETTINGS.get("repo_dir", "cache/repo"))
+
+
+def update_versions(files):
+    """
+    Record that the current version added the given files, relative to the
+    repository directory. Then delete the files of the versions that the
+    "repo_retention" setting no longer keeps. Returns those versions.
+    """
+    try:
+        with open(project_path(_VERSIONS_PATH)) as f:
+            versions = json.load(f)
+    except FileNotFoundError:
+        versions = {}
+    current = get_version()
+    added = versions.get(current, {}).get("added", date.today().isoformat())
+    versions[current] = {"added": added, "files": sorted(files)}
+    removed = get_expired_versions(versions, current, SETTINGS.get("repo_retention"))
+    repo_dir = get_repo_dir()
+    for version in removed:
+        for file_ in versions.pop(version)["files"]:
+            path = join(repo_dir, *file_.split("/"))
+            if isdir(path):
+                rmtree(path)
+            elif exists(path):
+                remove(path)
+    makedirs(dirname(project_path(_VERSIONS_PATH)), exist_ok=True)
+    with open(project_path(_VERSIONS_PATH), "w") as f:
+        json.dump(versions, f, indent=2, sort_keys=True)
+    if removed:
+        _LOG.info("Removed old versions from the repository: %s", ", ".join(removed))
+    return removed
+
+
+def get_expired_versions(versions, current, retention):
+    """
+    retention is a dict with "keep_last": <number of versions> and/or
+    "newer_than": <ISO date>. Never includes the current version.
+    """
+    if not retention:
+        return []
+    unknown = set(retention) - {"keep_last", "newer_than"}
+    if unknown:
+        raise PbtError(
+            'Unsupported repo_retention option(s): %s. Please use "keep_last" '
+            'and/or "newer_than".' % ", ".join(sorted(unknown))
+        )
+    keep_last = retention.get("keep_last")
+    newer_than = retention.get("newer_than")
+    newest_first = sorted(versions, key=Version, reverse=True)
+    result = []
+    for i, version in enumerate(newest_first):
+        if version == current:
+            continue
+        if (keep_last is not None and i >= keep_last) or (
+            newer_than is not None and versions[version]["added"] < newer_than
+        ):
+            result.append(version)
+    return result
@@ -0,0 +1,218 @@
+"""
+A built-in alternative to reprepro for Ubuntu repositories. Enable it via the
+setting "apt_repo_backend": "native". Unlike reprepro, it keeps the older
+versions of the app in the pool. So "repo_retention" applies to them.
+"""
+from ppt._gpg import GpgSession
+from ppt.error import PbtError
+from ppt.installer.compression import compress_file
+from ppt.installer.deb import format_control, parse_control, read_deb_control
+from ppt.paths import project_path
+from ppt.repo import get_repo_dir, update_versions
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+from os import makedirs, remove, replace
+from os.path import dirname, exists, join, relpath
+from shutil import copy
+
+import hashlib
+import mmap
+import os
+
+# The checksum fields of Release, which are also the by-hash directory names,
+# and the corresponding hashlib algorithms:
+_HASHES = (("MD5Sum", "md5"), ("SHA1", "sha1"), ("SHA256", "sha256"))
+_COMPRESSIONS = (("Packages.gz", "gzip"), ("Packages.xz", "xz"))
+
+
+def create_repo_apt(distributions_path):
+    """
+    Add target/${installer} to the pool of the repository and regenerate its
+    metadata. distributions_path is reprepro's (filtered) distributions file.
+    """
+    distribution = get_distribution(distributions_path)
+    repo_dir = get_repo_dir()
+    deb_path = project_path("target/${installer}")
+    control = read_deb_control(deb_path)
+    pool_path = get_pool_path(control, distribution["Components"].split()[0])
+    dest = join(repo_dir, *pool_path.split("/"))
+    makedirs(dirname(dest), exist_ok=True)
+    copy(deb_path, dest)
+    update_versions([pool_path])
+    write_apt_metadata(repo_dir, distribution, sign=bool(distribution.get("SignWith")))
+
+
+def get_distribution(distributions_path, codename="stable"):
+    with open(distributions_path) as f:
+        stanzas = f.read().split("\n\n")
+    for stanza in stanzas:
+        distribution = parse_control(stanza)
+        if distribution.get("Codename") == codename:
+            return distribution
+    raise PbtError("Could not find Codename: %s in %s" % (codename, distributions_path))
+
+
+def get_pool_path(control, component):
+    package = control["Package"]
+    file_name = "%s_%s_%s.deb" % (package, control["Version"], control["Architecture"])
+    return "/".join(["pool", component, package[0], package, file_name])
+
+
+def write_apt_metadata(repo_dir, distribution, sign=False):
+    """
+    Generate dists/<Codename> from the .deb packages below repo_dir/pool.
+    Every index is also stored as by-hash/<field>/<digest>, and Release is
+    replaced last. So clients never see a Release that refers to indices which
+    don't exist yet. The by-hash files of the previous Release are kept for
+    clients that are still downloading it.
+    """
+    codename = distribution["Codename"]
+    component = distribution["Components"].split()[0]
+    dist_dir = join(repo_dir, "dists", codename)
+    packages = _read_packages(repo_dir)
+    indices = {}
+    for arch in distribution["Architectures"].split():
+        stanzas = [stanza for arch_, stanza in packages if arch_ in (arch, "all")]
+        index_dir = "%s/binary-%s" % (component, arch)
+        indices.update(_write_indices(dist_dir, index_dir, "\n".join(stanzas)))
+    release_path = join(dist_dir, "Release")
+    to_keep = _read_release_digests(release_path)
+    release = format_control(
+        {
+            "Origin": distribution.get("Origin", ""),
+            "Label": distribution.get("Label", ""),
+            "Suite": distribution.get("Suite", codename),
+            "Codename": codename,
+            "Date": formatdate(usegmt=True),
+            "Architectures": distribution["Architectures"],
+            "Components": distribution["Components"],
+            "Description": distribution.get("Description", ""),
+            "Acquire-By-Hash": "yes",
+        }
+    )
+    for field, algorithm in _HASHES:
+        release += field + ":\n"
+        for path, hashes in sorted(indices.items()):
+            release += " %s %16d %s\n" % (hashes[algorithm], hashes["size"], path)
+    with open(release_path + ".tmp", "w") as f:
+        f.write(release)
+    signatures = (
+        (release_path + ".tmp.asc", join(dist_dir, "Release.gpg")),
+        (join(dist_dir, "InRelease.tmp"), join(dist_dir, "InRelease")),
+    )
+    if sign:
+        session = GpgSession.instance()
+        session.clearsign(release_path + ".tmp", signatures[1][0])
+        session.detach_sign([release_path + ".tmp"], armor=True)
+        for tmp_path, path in signatures:
+            replace(tmp_path, path)
+    else:
+        for _, path in signatures:
+            if exists(path):
+                remove(path)
+    replace(release_path + ".tmp", release_path)
+    to_keep.update(
+        hashes[algorithm] for hashes in indices.values() for _, algorithm in _HASHES
+    )
+    _prune_by_hash(dist_dir, to_keep)
+
+
+def _read_packages(repo_dir):
+    """
+    Return a list of (architecture, Packages stanza) pairs for the .deb
+    packages below repo_dir/pool.
+    """
+    deb_paths = []
+    for subdir, dir_names, file_names in os.walk(join(repo_dir, "pool")):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            if file_name.endswith(".deb"):
+                deb_paths.append(join(subdir, file_name))
+    with ThreadPoolExecutor() as executor:
+        return list(executor.map(lambda p: _read_package(repo_dir, p), deb_paths))
+
+
+def _read_package(repo_dir, deb_path):
+    control = read_deb_control(deb_path)
+    hashes = _hash_file(deb_path)
+    stanza = dict(control)
+    stanza.update(
+        {
+            "Filename": relpath(deb_path, repo_dir).replace(os.sep, "/"),
+            "Size": str(hashes["size"]),
+            "MD5sum": hashes["md5"],
+            "SHA1": hashes["sha1"],
+            "SHA256": hashes["sha256"],
+        }
+    )
+    return control["Architecture"], format_control(stanza)
+
+
+def _write_indices(dist_dir, index_dir, packages):
+    """
+    Write Packages and its compressed variants to dist_dir/index_dir. Returns
+    a dict mapping their paths relative to dist_dir to their sizes and hashes.
+    """
+    dir_path = join(dist_dir, *index_dir.split("/"))
+    makedirs(dir_path, exist_ok=True)
+    tmp_path = join(dir_path, "Packages.tmp")
+    with open(tmp_path, "w") as f:
+        f.write(packages)
+    to_write = [("Packages", tmp_path)]
+    for name, codec in _COMPRESSIONS:
+        compress_file(tmp_path, join(dir_path, name + ".tmp"), codec)
+        to_write.append((name, join(dir_path, name + ".tmp")))
+    with ThreadPoolExecutor() as executor:
+        hashes = list(executor.map(_hash_file, [path for _, path in to_write]))
+    result = {}
+    for (name, tmp_path), file_hashes in zip(to_write, hashes):
+        for field, algorithm in _HASHES:
+            by_hash_path = join(dir_path, "by-hash", field, file_hashes[algorithm])
+            if not exists(by_hash_path):
+                makedirs(dirname(by_hash_path), exist_ok=True)
+                copy(tmp_path, by_hash_path)
+        result[index_dir + "/" + name] = file_hashes
+    # Only now that the by-hash files exist, replace the files at the old paths:
+    for name, tmp_path in to_write:
+        replace(tmp_path, join(dir_path, name))
+    return result
+
+
+def _hash_file(file_path):
+    """
+    Return the size and all _HASHES of the given file. The file is mapped into
+    memory instead of being read in chunks. hashlib releases the GIL while it
+    hashes large buffers, so this runs in parallel in a thread pool.
+    """
+    hashers = {algorithm: hashlib.new(algorithm) for _, algorithm in _HASHES}
+    with open(file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        # Empty files can't be mapped:
+        if size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for hasher in hashers.values():
+                    hasher.update(data)
+    result = {algorithm: hasher.hexdigest() for algorithm, hasher in hashers.items()}
+    result["size"] = size
+    return result
+
+
+def _read_release_digests(release_path):
+    try:
+        with open(release_path) as f:
+            release = parse_control(f.read())
+    except FileNotFoundError:
+        return set()
+    result = set()
+    for field, _ in _HASHES:
+        # Each line is "<digest> <size> <path>":
+        result.update(release.get(field, "").split()[::3])
+    return result
+
+
+def _prune_by_hash(dist_dir, to_keep):
+    for subdir, _, file_names in os.walk(dist_dir):
+        if dirname(subdir).endswith("by-hash"):
+            for file_name in file_names:
+                if file_name not in to_keep:
+                    remove(join(subdir, file_name))
@@ -1,10 +1,12 @@
 from ppt import SETTINGS
 from ppt.error import PbtError
+from ppt.installer.linux import get_pacman_extension
 from ppt.paths import project_path
+from ppt.repo import get_repo_dir, update_versions
 from ppt._variables import get_version
 from os import makedirs
 from os.path import exists, join
-from shutil import rmtree, copy
+from shutil import copy
 from subprocess import check_call, DEVNULL
 
 
@@ -15,15 +17,16 @@ def create_repo_arch():
             "run:\n"
             "    ppt signinst"
         )
-    dest_dir = project_path("target/repo")
-    if exists(dest_dir):
-        rmtree(dest_dir)
-    makedirs(dest_dir)
+    dest_dir = get_repo_dir()
+    makedirs(dest_dir, exist_ok=True)
     app_name = SETTINGS["app_name"]
     pkg_file = project_path("target/${installer}")
-    pkg_file_versioned = "%s-%s.pkg.tar.xz" % (app_name, get_version())
+    pkg_file_versioned = "%s-%s%s" % (app_name, get_version(), get_pacman_extension())
     copy(pkg_file, join(dest_dir, pkg_file_versioned))
     copy(pkg_file + ".sig", join(dest_dir, pkg_file_versioned + ".sig"))
+    update_versions([pkg_file_versioned, pkg_file_versioned + ".sig"])
+    # repo-add updates an existing database. Packages of previous versions stay
+    # in dest_dir until "repo_retention" removes them:
     check_call(
         ["repo-add", "%s.db.tar.gz" % app_name, pkg_file_versioned],
         cwd=dest_dir,
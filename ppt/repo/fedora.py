@@ -1,26 +1,41 @@
+from ppt import SETTINGS
+from ppt.repo import get_repo_dir, update_versions
 from ppt.resources import copy_with_filtering
 from ppt.paths import default_path, project_path
-from os import makedirs, rename
-from os.path import exists
-from shutil import rmtree, copy
+from ppt._variables import get_version
+from os import makedirs, replace
+from os.path import exists, join
+from shutil import copy
 from subprocess import check_call, DEVNULL
 
 
 def create_repo_fedora():
-    if exists(project_path("target/repo")):
-        rmtree(project_path("target/repo"))
-    makedirs(project_path("target/repo/${version}"))
-    copy(project_path("target/${installer}"), project_path("target/repo/${version}"))
-    check_call(["createrepo_c", "."], cwd=(project_path("target/repo")), stdout=DEVNULL)
+    dest_dir = get_repo_dir()
+    version_dir = join(dest_dir, get_version())
+    makedirs(version_dir, exist_ok=True)
+    copy(project_path("target/${installer}"), version_dir)
+    update_versions([get_version()])
+    # This also removes the packages deleted by update_versions(...) from the
+    # metadata. --update reuses the metadata of unchanged packages. The cache
+    # saves recomputing their checksums:
+    check_call(
+        [
+            "createrepo_c",
+            "--update",
+            "--cachedir",
+            project_path("cache/createrepo"),
+            ".",
+        ],
+        cwd=dest_dir,
+        stdout=DEVNULL,
+    )
     repo_file = project_path("${build_system_dir}/repo/fedora/${app_name}.repo")
     use_default = not exists(repo_file)
     if use_default:
         repo_file = default_path("${build_system_dir}/repo/fedora/AppName.repo")
-    copy_with_filtering(
-        repo_file, project_path("target/repo"), files_to_filter=[repo_file]
-    )
+    copy_with_filtering(repo_file, dest_dir, files_to_filter=[repo_file])
     if use_default:
-        rename(
-            project_path("target/repo/AppName.repo"),
-            project_path("target/repo/${app_name}.repo"),
+        replace(
+            join(dest_dir, "AppName.repo"),
+            join(dest_dir, SETTINGS["app_name"] + ".repo"),
         )
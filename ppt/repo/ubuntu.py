@@ -1,17 +1,17 @@
-from ppt._gpg import preset_gpg_passphrase
+from ppt import SETTINGS
+from ppt._gpg import GpgSession
+from ppt.repo import get_repo_dir, update_versions
 from ppt.resources import copy_with_filtering
 from ppt.paths import default_path, project_path
 from os import makedirs
-from os.path import exists
+from os.path import exists, join
 from shutil import rmtree
 from subprocess import check_call, DEVNULL
 
 
 def create_repo_ubuntu():
-    dest_dir = project_path("target/repo")
+    dest_dir = get_repo_dir()
     tmp_dir = project_path("target/repo-tmp")
-    if exists(dest_dir):
-        rmtree(dest_dir)
     if exists(tmp_dir):
         rmtree(tmp_dir)
     makedirs(tmp_dir)
@@ -20,7 +20,15 @@ def create_repo_ubuntu():
     if not exists(distr_path):
         distr_path = default_path(distr_file)
     copy_with_filtering(distr_path, tmp_dir, files_to_filter=[distr_path])
-    preset_gpg_passphrase()
+    if SETTINGS.get("apt_repo_backend") == "native":
+        from ppt.repo.apt import create_repo_apt
+
+        create_repo_apt(join(tmp_dir, "distributions"))
+        return
+    # reprepro signs the repository via the agent of this session:
+    GpgSession.instance().start()
+    # reprepro keeps its database in dest_dir/db. So this only adds the new
+    # package and updates the indices that refer to it:
     check_call(
         [
             "reprepro",
@@ -34,3 +42,6 @@ def create_repo_ubuntu():
         ],
         stdout=DEVNULL,
     )
+    # reprepro keeps only the newest version of each package and deletes the
+    # files of older ones itself. So there are no files to record:
+    update_versions([])
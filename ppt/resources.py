@@ -8,6 +8,7 @@ from os.path import dirname, isfile, join, basename, relpath, splitext, exists
 from pathlib import Path
 from shutil import copy, copymode
 
+import ppt_runtime.resources as pack_format
 import re
 import os
 
@@ -43,6 +44,7 @@ def copy_with_filtering(
             _copy_with_filtering(src, dest, replacements, placeholder)
         else:
             makedirs(dirname(dest), exist_ok=True)
+            _unlink_hard_link(dest)
             copy(src, dest)
 
 
@@ -90,6 +92,7 @@ def _copy_with_filtering(
         dest_file = dest_file.replace(placeholder % key, str(value))
     with open(src_file, "rb") as open_src_file:
         makedirs(dirname(dest_file), exist_ok=True)
+        _unlink_hard_link(dest_file)
         with open(dest_file, "wb") as open_dest_file:
             for line in open_src_file:
                 new_line = line
@@ -99,6 +102,18 @@ def _copy_with_filtering(
         copymode(src_file, dest_file)
 
 
+def _unlink_hard_link(path):
+    """
+    Eg. target/installer links the files of ${freeze_dir}. Writing to such a
+    file would also change the frozen app. So replace the link by a new file.
+    """
+    try:
+        if os.stat(path).st_nlink > 1:
+            os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
 class PathContainer:
     def __init__(self, paths):
         self._paths = []
@@ -135,3 +150,55 @@ def _copy(path_fn, src, dst):  # Used by several other internal ppt modules
         copy_with_filtering(src, dst, files_to_filter=filter_)
         return True
     return False
+
+
+def pack_resources(src_dir, dest_path, compression=None):
+    """
+    Pack the files below src_dir into a single file for
+    ppt_runtime.resources.ResourcePack. compression can be None or "zstd". It
+    is applied per entry and only kept where it makes the entry smaller.
+    """
+    if compression not in (None, "zstd"):
+        raise PbtError("Unsupported resource pack compression: %r" % compression)
+    if compression:
+        # Import late so zstandard is only needed when the option is used:
+        try:
+            import zstandard
+        except ImportError:
+            raise PbtError(
+                "Compressing resources with zstd requires zstandard. Maybe you "
+                "need to:\n    pip install zstandard"
+            ) from None
+        compressor = zstandard.ZstdCompressor(level=19)
+    names = []
+    for subdir, _, files in os.walk(src_dir):
+        for file_ in files:
+            names.append(relpath(join(subdir, file_), src_dir).replace(os.sep, "/"))
+    names.sort()
+    encoded_names = [name.encode("utf-8") for name in names]
+    data_offset = len(pack_format.MAGIC) + pack_format.HEADER.size
+    data_offset += sum(pack_format.NAME_LENGTH.size + len(n) for n in encoded_names)
+    data_offset += len(names) * pack_format.ENTRY.size
+    index = []
+    makedirs(dirname(dest_path), exist_ok=True)
+    with open(dest_path, "wb") as f:
+        f.seek(data_offset)
+        offset = 0
+        for name in names:
+            with open(join(src_dir, *name.split("/")), "rb") as src:
+                data = src.read()
+            original_size = len(data)
+            codec = pack_format.CODEC_NONE
+            if compression:
+                compressed = compressor.compress(data)
+                if len(compressed) < len(data):
+                    data, codec = compressed, pack_format.CODEC_ZSTD
+            f.write(data)
+            index.append((offset, len(data), original_size, codec))
+            offset += len(data)
+        f.seek(0)
+        f.write(pack_format.MAGIC)
+        f.write(pack_format.HEADER.pack(len(names), data_offset))
+        for encoded_name, entry in zip(encoded_names, index):
+            f.write(pack_format.NAME_LENGTH.pack(len(encoded_name)) + encoded_name)
+            f.write(pack_format.ENTRY.pack(*entry))
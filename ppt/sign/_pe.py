@@ -0,0 +1,68 @@
+"""
+Reads just enough of the Portable Executable (PE) format to tell whether a
+Windows binary carries an Authenticode signature. See:
+https://learn.microsoft.com/en-us/windows/win32/debug/pe-format
+"""
+from os.path import getsize
+
+import struct
+
+_WIN_CERT_REVISION_2_0 = 0x0200
+_WIN_CERT_TYPE_PKCS_SIGNED_DATA = 0x0002
+_SECURITY_DIRECTORY = 4
+# Offsets of NumberOfRvaAndSizes and the data directories in the optional
+# header, for PE32 and PE32+ files:
+_OPTIONAL_HEADER_LAYOUT = {0x10B: (92, 96), 0x20B: (108, 112)}
+
+
+def has_authenticode_signature(file_path):
+    """
+    Return True if the given file is a PE file with an Authenticode signature
+    blob, False if it is a PE file without one and None if this can't be
+    determined, eg. because the file is not a PE file. The signature itself
+    is not verified.
+    """
+    try:
+        with open(file_path, "rb") as f:
+            return _has_signature(f, getsize(file_path))
+    except (OSError, struct.error):
+        return None
+
+
+def _has_signature(f, file_size):
+    header = f.read(64)
+    if header[:2] != b"MZ":
+        return None
+    (pe_offset,) = struct.unpack_from("<I", header, 0x3C)
+    f.seek(pe_offset)
+    if f.read(4) != b"PE\0\0":
+        return None
+    coff_header = f.read(20)
+    (optional_header_size,) = struct.unpack_from("<H", coff_header, 16)
+    optional_header = f.read(optional_header_size)
+    (magic,) = struct.unpack_from("<H", optional_header, 0)
+    try:
+        num_dirs_offset, dirs_offset = _OPTIONAL_HEADER_LAYOUT[magic]
+    except KeyError:
+        return None
+    (num_dirs,) = struct.unpack_from("<I", optional_header, num_dirs_offset)
+    if num_dirs <= _SECURITY_DIRECTORY:
+        return False
+    # Unlike the other data directories, the security directory's address is
+    # a file offset:
+    cert_offset, cert_size = struct.unpack_from(
+        "<II", optional_header, dirs_offset + 8 * _SECURITY_DIRECTORY
+    )
+    if not cert_offset or not cert_size:
+        return False
+    if cert_offset + cert_size > file_size or cert_size < 8:
+        return None
+    f.seek(cert_offset)
+    length, revision, cert_type = struct.unpack("<IHH", f.read(8))
+    if (
+        revision == _WIN_CERT_REVISION_2_0
+        and cert_type == _WIN_CERT_TYPE_PKCS_SIGNED_DATA
+        and 8 < length <= cert_size
+    ):
+        return True
+    return None
@@ -1,9 +1,12 @@
 from ppt import SETTINGS
 from ppt.error import PbtError
+from ppt._files import hash_file, hash_files
 from ppt.paths import get_build_system_dir, project_path
-from os import makedirs
-from os.path import join, splitext, dirname, basename, exists
-from shutil import copy
+from ppt.sign._pe import has_authenticode_signature
+from concurrent.futures import ThreadPoolExecutor
+from os import makedirs, replace
+from os.path import join, splitext, dirname, basename, exists, getsize
+from shutil import copy, rmtree, which
 from subprocess import call, run, DEVNULL
 
 import hashlib
@@ -25,20 +28,43 @@ def sign_windows():
             f"{get_build_system_dir()}/build/settings/secret.json, .../windows.json or .../base.json."
             % _CERTIFICATE_PATH
         )
+    file_paths = []
     for subdir, _, files in os.walk(project_path("${freeze_dir}")):
         for file_ in files:
             extension = splitext(file_)[1]
             if extension in _TO_SIGN:
-                sign_file(join(subdir, file_))
+                file_paths.append(join(subdir, file_))
+    sign_files(file_paths)
 
 
 def sign_file(file_path, description="", url=""):
+    sign_files([file_path], description, url)
+
+
+def sign_files(file_paths, description="", url=""):
+    """
+    Sign the given files that are not yet signed. The checks and the signing
+    run in a pool of "windows_sign_workers" threads. Each invocation of the
+    signer signs up to "windows_sign_batch_size" files.
+    """
     helper = _SignHelper.instance()
-    if not helper.is_signed(file_path):
-        helper.sign(file_path, description, url)
+    with ThreadPoolExecutor(SETTINGS.get("windows_sign_workers", 8)) as executor:
+        is_signed = list(executor.map(helper.is_signed, file_paths))
+        to_sign = [p for p, signed in zip(file_paths, is_signed) if not signed]
+        helper.sign(to_sign, description, url, executor)
+
+
+def _split_into_batches(items, batch_size):
+    return [items[i : i + batch_size] for i in range(0, len(items), batch_size)]
 
 
 class _SignHelper:
+    """
+    Signs files and caches the results. The cache is content-addressed: Each
+    signed file is stored under the SHA-256 of its unsigned contents and the
+    signing parameters, in objects/<first two hex digits>/<key>. index.json
+    records the size of each object to detect incomplete ones.
+    """
 
     _INSTANCE = None
 
@@ -51,44 +77,130 @@ class _SignHelper:
     def __init__(self, cache_dir):
         self._cache_dir = cache_dir
 
+    @property
+    def batch_size(self):
+        command = SETTINGS.get("windows_sign_command")
+        if command and "{files}" not in command:
+            # The command signs a single {file}:
+            return 1
+        return SETTINGS.get("windows_sign_batch_size", 32)
+
     def is_signed(self, file_path):
+        # Parsing the file is much faster than spawning signtool. Only ask
+        # signtool when the parser can't tell:
+        result = has_authenticode_signature(file_path)
+        if result is not None:
+            return result
+        if not which("signtool"):
+            # Eg. on Linux with a custom windows_sign_command. The cache still
+            # prevents files from being signed twice:
+            return False
         return not call(
             ["signtool", "verify", "/pa", file_path], stdout=DEVNULL, stderr=DEVNULL
         )
 
-    def sign(self, file_path, description, url):
-        json_path = self._get_json_path(file_path)
+    def sign(self, file_paths, description, url, executor):
+        keys = self._get_keys(file_paths, description, url)
+        index = self._load_index()
+        # Files with the same contents only need to be signed once:
+        to_sign = {}
+        for file_path, key in zip(file_paths, keys):
+            if not self._is_cached(key, index):
+                to_sign.setdefault(key, file_path)
+        batches = _split_into_batches(sorted(to_sign.items()), self.batch_size)
+        for signed in executor.map(
+            lambda batch: self._sign(batch, description, url), batches
+        ):
+            index.update(signed)
+        if to_sign:
+            self._save_index(index)
+        for file_path, key in zip(file_paths, keys):
+            copy(self._get_object_path(key), file_path)
+
+    def _get_keys(self, file_paths, description, url):
+        certificate = project_path(_CERTIFICATE_PATH)
+        params = {
+            "description": description,
+            "url": url,
+            "digests": self._get_digests(),
+            # Identifies the certificate without having to decrypt it:
+            "certificate": hash_file(certificate) if exists(certificate) else "",
+            "command": SETTINGS.get("windows_sign_command"),
+        }
+        params_json = json.dumps(params, sort_keys=True)
+        return [
+            hashlib.sha256((digest + params_json).encode("utf-8")).hexdigest()
+            for digest in hash_files(file_paths)
+        ]
+
+    def _is_cached(self, key, index):
+        try:
+            return getsize(self._get_object_path(key)) == index[key]["size"]
+        except (KeyError, OSError):
+            return False
+
+    def _sign(self, batch, description, url):
+        """
+        Sign the files in batch, a list of (key, file_path) pairs, and put the
+        results into the cache. Returns the new index entries.
+        """
+        paths_in_work_dir = []
+        for key, file_path in batch:
+            # Keep the file name. But use a separate directory for each file,
+            # so files with the same name don't clash:
+            path_in_work_dir = join(self._cache_dir, "tmp", key, basename(file_path))
+            makedirs(dirname(path_in_work_dir), exist_ok=True)
+            copy(file_path, path_in_work_dir)
+            paths_in_work_dir.append(path_in_work_dir)
+        for digest_alg in self._get_digests():
+            self._run_signer(paths_in_work_dir, digest_alg, description, url)
+        result = {}
+        for (key, _), path_in_work_dir in zip(batch, paths_in_work_dir):
+            object_path = self._get_object_path(key)
+            makedirs(dirname(object_path), exist_ok=True)
+            replace(path_in_work_dir, object_path)
+            rmtree(dirname(path_in_work_dir))
+            result[key] = {"size": getsize(object_path)}
+        return result
+
+    def _get_digests(self):
+        return SETTINGS.get("windows_sign_digests", ["sha1", "sha256"])
+
+    def _get_object_path(self, key):
+        return join(self._cache_dir, "objects", key[:2], key)
+
+    def _load_index(self):
         try:
-            with open(json_path) as f:
-                cached = json.load(f)
-            is_in_cache = (
-                description == cached["description"]
-                and url == cached["url"]
-                and self._hash(file_path) == cached["hash"]
+            with open(join(self._cache_dir, "index.json")) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_index(self, index):
+        makedirs(self._cache_dir, exist_ok=True)
+        index_path = join(self._cache_dir, "index.json")
+        with open(index_path + ".tmp", "w") as f:
+            json.dump(index, f, indent=2, sort_keys=True)
+        replace(index_path + ".tmp", index_path)
+
+    def _run_signer(self, file_paths, digest_alg, description="", url=""):
+        command = SETTINGS.get("windows_sign_command")
+        if command:
+            args = _fill_in_command(
+                command,
+                file_paths,
+                certificate=project_path(_CERTIFICATE_PATH),
+                password=SETTINGS["windows_sign_pass"],
+                digest=digest_alg,
+                timestamp_server=SETTINGS.get("windows_sign_server", ""),
+                description=description,
+                url=url,
             )
-        except FileNotFoundError:
-            is_in_cache = False
-        if not is_in_cache:
-            self._sign(file_path, description, url)
-        copy(self._get_path_in_cache(file_path), file_path)
-
-    def _sign(self, file_path, description, url):
-        path_in_cache = self._get_path_in_cache(file_path)
-        makedirs(dirname(path_in_cache), exist_ok=True)
-        copy(file_path, path_in_cache)
-        hash_ = self._hash(path_in_cache)
-        self._run_signtool(path_in_cache, "sha1")
-        self._run_signtool(path_in_cache, "sha256")
-        with open(self._get_json_path(file_path), "w") as f:
-            json.dump({"description": description, "url": url, "hash": hash_}, f)
-
-    def _get_json_path(self, file_path):
-        return self._get_path_in_cache(file_path) + ".json"
-
-    def _get_path_in_cache(self, file_path):
-        return join(self._cache_dir, basename(file_path))
-
-    def _run_signtool(self, file_path, digest_alg, description="", url=""):
+        else:
+            args = self._get_signtool_args(digest_alg, description, url) + file_paths
+        run(args, check=True, stdout=DEVNULL)
+
+    def _get_signtool_args(self, digest_alg, description, url):
         password = SETTINGS["windows_sign_pass"]
         args = [
             "signtool",
@@ -105,15 +217,22 @@ class _SignHelper:
         if url:
             args.extend(["/du", url])
         args.extend(["/as", "/fd", digest_alg, "/td", digest_alg])
-        args.append(file_path)
-        run(args, check=True, stdout=DEVNULL)
-
-    def _hash(self, file_path):
-        bufsize = 65536
-        hasher = hashlib.md5()
-        with open(file_path, "rb") as f:
-            buf = f.read(bufsize)
-            while buf:
-                hasher.update(buf)
-                buf = f.read(bufsize)
-        return hasher.hexdigest()
+        return args
+
+
+def _fill_in_command(command, file_paths, **values):
+    """
+    Fill in the placeholders of the "windows_sign_command" setting. It is a
+    list of arguments, which may contain {certificate}, {password}, {digest},
+    {timestamp_server}, {description} and {url}. An argument "{files}" is
+    replaced by all files to sign. Otherwise, {file} stands for the single file
+    to sign. The command must sign the files in place.
+    """
+    result = []
+    for arg in command:
+        if arg == "{files}":
+            result.extend(file_paths)
+        else:
+            file_path = file_paths[0] if len(file_paths) == 1 else None
+            result.append(arg.format(file=file_path, **values))
+    return result
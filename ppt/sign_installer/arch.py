@@ -1,24 +1,7 @@
-from ppt import SETTINGS
 from ppt.paths import project_path
-from ppt._gpg import preset_gpg_passphrase
-from subprocess import check_call, DEVNULL
+from ppt._gpg import GpgSession
 
 
 def sign_installer_arch():
-    installer = project_path("target/${installer}")
-    # Prevent GPG from prompting us for the passphrase when signing:
-    preset_gpg_passphrase()
-    check_call(
-        [
-            "gpg",
-            "--batch",
-            "--yes",
-            "-u",
-            SETTINGS["gpg_key"],
-            "--output",
-            installer + ".sig",
-            "--detach-sig",
-            installer,
-        ],
-        stdout=DEVNULL,
-    )
+    # The session prevents GPG from prompting us for the passphrase:
+    GpgSession.instance().detach_sign([project_path("target/${installer}")])
@@ -1,11 +1,7 @@
 from ppt.paths import project_path
-from ppt._gpg import preset_gpg_passphrase
-from subprocess import check_call, DEVNULL
+from ppt._gpg import GpgSession
 
 
 def sign_installer_fedora():
-    # Prevent GPG from prompting us for the passphrase when signing:
-    preset_gpg_passphrase()
-    check_call(
-        ["rpm", "--addsign", project_path("target/${installer}")], stdout=DEVNULL
-    )
+    # The session prevents GPG from prompting us for the passphrase:
+    GpgSession.instance().rpm_addsign([project_path("target/${installer}")])
@@ -1,11 +1,23 @@
 from ppt import _server, SETTINGS
-from ppt._aws import upload_file, upload_folder_contents
+from ppt._aws import (
+    delete_files,
+    upload_file,
+    upload_folder_contents,
+    _iter_files_recursive,
+)
+from ppt._files import hash_files
 from ppt.error import PbtError
 from ppt.platform import is_linux
 from ppt.paths import project_path
-from os.path import basename
+from ppt.repo import get_repo_dir
+from os import makedirs
+from os.path import basename, dirname, exists, join, relpath
 
 import json
+import os
+
+# Records the hashes of the files uploaded by _upload_changed_files(...):
+_UPLOAD_STATE = "cache/uploaded.json"
 
 
 def _upload_repo(username, password):
@@ -30,11 +42,14 @@ def _upload_repo(username, password):
     installer_dest = dest_path(basename(installer))
     upload_file(installer, installer_dest, *credentials)
     uploaded = [installer_dest]
-    if is_linux():
-        repo_dest = dest_path(SETTINGS["repo_subdir"])
+    delta_dir = project_path("target/delta")
+    if exists(delta_dir):
         uploaded.extend(
-            upload_folder_contents(project_path("target/repo"), repo_dest, *credentials)
+            upload_folder_contents(delta_dir, dest_path("delta"), *credentials)
         )
+    if is_linux():
+        repo_dest = dest_path(SETTINGS["repo_subdir"])
+        uploaded.extend(_upload_changed_files(get_repo_dir(), repo_dest, credentials))
         pubkey_dest = dest_path("public-key.gpg")
         upload_file(
             project_path("${build_system_dir}/sign/linux/public-key.gpg"),
@@ -48,3 +63,38 @@ def _upload_repo(username, password):
     )
     if status != 201:
         raise unexpected_response()
+
+
+def _upload_changed_files(dir_path, dest_path, credentials):
+    """
+    Upload the files below dir_path that changed since the last upload to
+    dest_path. Delete the remote copies of files that were removed from
+    dir_path since then, eg. by "repo_retention". Returns the destinations of
+    the uploaded files.
+    """
+    state_path = project_path(_UPLOAD_STATE)
+    try:
+        with open(state_path) as f:
+            state = json.load(f)
+    except (FileNotFoundError, ValueError):
+        state = {}
+    previous = state.get(dest_path, {})
+    file_paths = sorted(_iter_files_recursive(dir_path))
+    current = {
+        relpath(file_path, dir_path).replace(os.sep, "/"): digest
+        for file_path, digest in zip(file_paths, hash_files(file_paths))
+    }
+    result = []
+    for file_relpath, digest in sorted(current.items()):
+        if previous.get(file_relpath) != digest:
+            file_dest = dest_path + "/" + file_relpath
+            upload_file(join(dir_path, file_relpath), file_dest, *credentials)
+            result.append(file_dest)
+    deleted = sorted(dest_path + "/" + p for p in set(previous) - set(current))
+    if deleted:
+        delete_files(deleted, *credentials)
+    state[dest_path] = current
+    makedirs(dirname(state_path), exist_ok=True)
+    with open(state_path, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    return result
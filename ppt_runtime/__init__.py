@@ -0,0 +1,5 @@
+"""
+This package is meant to be imported by apps frozen with ppt. Unlike ppt
+itself, it only depends on Python's standard library, so PyInstaller can
+bundle it with your app at little cost.
+"""
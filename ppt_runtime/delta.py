@@ -0,0 +1,120 @@
+"""
+Applies the delta updates created by `ppt delta`. A delta is a zip file with a
+manifest.json and the compressed data of new or changed files:
+
+    {
+        "from": "1.0.0",
+        "to": "1.0.1",
+        "files": {
+            "MyApp": {"sha256": ..., "mode": 493, "action": "patch",
+                      "source": "MyApp", "base": <sha256 of source>,
+                      "member": "data/<base>-<sha256>.zstd", "codec": "zstd"},
+            "lib/a.so": {"sha256": ..., "mode": 420, "action": "keep",
+                         "source": "lib/a.so"},
+            "lib/b.so": {"sha256": ..., "mode": 420, "action": "full",
+                         "member": "data/<sha256>.xz", "codec": "xz"}
+        },
+        "links": {"lib/c.so": "b.so"},
+        "removed": ["lib/old.so"]
+    }
+
+"patch" entries are zstd frames compressed with the source file as raw
+content dictionary. They require the zstandard package. "full" entries are xz
+compressed. All paths are "/" separated and relative to the app directory.
+"""
+from os.path import dirname, join
+from shutil import copyfile
+
+import hashlib
+import json
+import lzma
+import os
+import zipfile
+
+MANIFEST_NAME = "manifest.json"
+CODEC_XZ = "xz"
+CODEC_ZSTD = "zstd"
+# The largest window zstd may need for patching big files:
+MAX_WINDOW_SIZE = 2**31
+
+
+class DeltaError(Exception):
+    pass
+
+
+def read_manifest(delta_path):
+    with zipfile.ZipFile(delta_path) as archive:
+        return json.loads(archive.read(MANIFEST_NAME))
+
+
+def apply_delta(delta_path, old_dir, new_dir):
+    """
+    Create the new version of the app in new_dir from the old version in
+    old_dir and the given delta. Verifies the hash of every input and output
+    file. Raises DeltaError if one does not match. old_dir is not modified.
+    """
+    with zipfile.ZipFile(delta_path) as archive:
+        manifest = json.loads(archive.read(MANIFEST_NAME))
+        for path, entry in sorted(manifest["files"].items()):
+            dest = _join(new_dir, path)
+            os.makedirs(dirname(dest), exist_ok=True)
+            action = entry["action"]
+            if action == "keep":
+                copyfile(_join(old_dir, entry["source"]), dest)
+            elif action == "patch":
+                source = _read(_join(old_dir, entry["source"]))
+                _check_hash(source, entry["base"], entry["source"])
+                data = _decompress(archive.read(entry["member"]), entry, source)
+                _write(dest, data)
+            elif action == "full":
+                _write(dest, _decompress(archive.read(entry["member"]), entry))
+            else:
+                raise DeltaError("Unknown action %r for %s" % (action, path))
+            _check_hash(_read(dest), entry["sha256"], path)
+            os.chmod(dest, entry["mode"])
+        for path, target in sorted(manifest.get("links", {}).items()):
+            dest = _join(new_dir, path)
+            os.makedirs(dirname(dest), exist_ok=True)
+            os.symlink(target, dest)
+    return manifest
+
+
+def _decompress(data, entry, source=None):
+    codec = entry["codec"]
+    if codec == CODEC_XZ:
+        return lzma.decompress(data)
+    if codec == CODEC_ZSTD:
+        import zstandard
+
+        dict_data = None
+        if source is not None:
+            dict_data = zstandard.ZstdCompressionDict(
+                source, dict_type=zstandard.DICT_TYPE_RAWCONTENT
+            )
+        decompressor = zstandard.ZstdDecompressor(
+            dict_data=dict_data, max_window_size=MAX_WINDOW_SIZE
+        )
+        return decompressor.decompress(data)
+    raise DeltaError("Unknown codec %r" % codec)
+
+
+def _check_hash(data, expected, path):
+    actual = hashlib.sha256(data).hexdigest()
+    if actual != expected:
+        raise DeltaError(
+            "%s has SHA-256 %s but the delta expects %s" % (path, actual, expected)
+        )
+
+
+def _join(root, path):
+    return join(root, *path.split("/"))
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _write(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
@@ -0,0 +1,127 @@
+"""
+Access to your app's resources at run time. When the freeze option
+"resources_pack" is set, ppt packs ${build_system_dir}/resources into a single
+file. This module serves its entries via mmap, without copying them. When
+running from source, or without the option, the loose files are read instead.
+
+A pack consists of a header, an index and a data region:
+
+    magic                     8 bytes  b"PPTPACK\\x01"
+    number of entries         uint32
+    offset of data region     uint64
+    for each entry:
+        length of name        uint16
+        name                  UTF-8, "/" separated
+        offset in data region uint64
+        stored size           uint64
+        original size         uint64
+        codec                 uint8    0 = none, 1 = zstd
+
+All integers are little-endian.
+"""
+from os.path import abspath, dirname, exists, join
+
+import mmap
+import os
+import struct
+import sys
+
+MAGIC = b"PPTPACK\x01"
+CODEC_NONE = 0
+CODEC_ZSTD = 1
+PACK_NAME = "resources.pack"
+
+HEADER = struct.Struct("<IQ")
+NAME_LENGTH = struct.Struct("<H")
+ENTRY = struct.Struct("<QQQB")
+
+_DEFAULT = None
+
+
+def get_resource_bytes(name):
+    """
+    Return the contents of the given resource, eg. "images/logo.png".
+    """
+    return bytes(get_resource_view(name))
+
+
+def get_resource_view(name):
+    """
+    Return a memoryview of the given resource. For uncompressed entries of a
+    resource pack, this does not copy any data.
+    """
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = _open_default()
+    return _DEFAULT.get_view(name)
+
+
+class ResourcePack:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        if self._view[: len(MAGIC)] != MAGIC:
+            raise ValueError("%s is not a resource pack" % path)
+        num_entries, self._data_offset = HEADER.unpack_from(self._view, len(MAGIC))
+        self._entries = {}
+        pos = len(MAGIC) + HEADER.size
+        for _ in range(num_entries):
+            (name_length,) = NAME_LENGTH.unpack_from(self._view, pos)
+            pos += NAME_LENGTH.size
+            name = bytes(self._view[pos : pos + name_length]).decode("utf-8")
+            pos += name_length
+            self._entries[name] = ENTRY.unpack_from(self._view, pos)
+            pos += ENTRY.size
+
+    def names(self):
+        return list(self._entries)
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def get_view(self, name):
+        try:
+            offset, size, original_size, codec = self._entries[name]
+        except KeyError:
+            raise FileNotFoundError(name) from None
+        start = self._data_offset + offset
+        data = self._view[start : start + size]
+        if codec == CODEC_ZSTD:
+            import zstandard
+
+            decompressor = zstandard.ZstdDecompressor()
+            return memoryview(decompressor.decompress(data, original_size))
+        return data
+
+    def get_bytes(self, name):
+        return bytes(self.get_view(name))
+
+    def close(self):
+        self._view.release()
+        self._mmap.close()
+
+
+class _LooseFiles:
+    def __init__(self, dir_path):
+        self._dir_path = dir_path
+
+    def get_view(self, name):
+        with open(join(self._dir_path, *name.split("/")), "rb") as f:
+            return memoryview(f.read())
+
+
+def _open_default():
+    if getattr(sys, "frozen", False):
+        app_dir = dirname(sys.executable)
+        if sys.platform == "darwin":
+            app_dir = join(app_dir, "..", "Resources")
+        pack_path = join(app_dir, "build_system", PACK_NAME)
+        if exists(pack_path):
+            return ResourcePack(pack_path)
+        return _LooseFiles(join(app_dir, "build_system", "resources"))
+    # Running from source. `ppt run` tells us where the resources are:
+    resources_dir = os.environ.get("PPT_RESOURCES_DIR")
+    if resources_dir is None:
+        resources_dir = abspath(join("build_system", "resources"))
+    return _LooseFiles(resources_dir)
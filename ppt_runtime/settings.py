@@ -0,0 +1,30 @@
+"""
+Fast access to your app's public settings at run time. `ppt freeze` and
+`ppt run` generate a Python module with the settings listed in
+"public_settings". Reading them is thus a single import, without any JSON
+parsing or file lookups. When frozen, the module is compiled into the app.
+"""
+from types import MappingProxyType
+
+# The name of the module that ppt generates:
+MODULE_NAME = "_ppt_public_settings"
+
+_SETTINGS = None
+
+
+def get_public_settings():
+    """
+    Return a read-only mapping of the public settings, for instance
+    get_public_settings()["version"].
+    """
+    global _SETTINGS
+    if _SETTINGS is None:
+        try:
+            from _ppt_public_settings import SETTINGS
+        except ImportError:
+            raise RuntimeError(
+                "Could not find the public settings. Please start the app via "
+                "`ppt run` or freeze it with `ppt freeze`."
+            ) from None
+        _SETTINGS = MappingProxyType(SETTINGS)
+    return _SETTINGS
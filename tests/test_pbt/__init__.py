@@ -1,4 +1,5 @@
 from ppt.resources import copy_with_filtering
+from os import makedirs
 from os.path import join, dirname
 from tempfile import TemporaryDirectory
 from unittest import TestCase
@@ -59,3 +60,26 @@ class PbtTest(TestCase):
 
     def _json_path(self, name):
         return join(self._project_dir, "build_system", "build", "settings", name)
+
+
+class TmpDirTest(TestCase):
+    """
+    For tests that only need an empty temporary directory, not a project.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self._tmp_dir = TemporaryDirectory()
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+        super().tearDown()
+
+    def _path(self, *parts):
+        """
+        Return the given path in the temporary directory. Creates its parent
+        directories.
+        """
+        result = join(self._tmp_dir.name, *parts)
+        makedirs(dirname(result), exist_ok=True)
+        return result
@@ -1,5 +1,6 @@
 from ppt.paths import project_path
-from ppt.builtin_commands import freeze, installer
+from ppt import SETTINGS
+from ppt.builtin_commands import _rename_pacman_installer, freeze, installer
 from ppt.platform import is_mac, is_windows, is_linux
 from os import listdir
 from os.path import exists, join
@@ -27,3 +28,13 @@ class BuiltInCommandsTest(PbtTest):
     def setUp(self):
         super().setUp()
         self.init_pbt()
+
+
+class RenamePacmanInstallerTest(PbtTest):
+    def test_rename_pacman_installer(self):
+        self._update_settings("linux.json", {"installer": "${app_name}.pkg.tar.xz"})
+        self.init_pbt("Linux")
+        _rename_pacman_installer("zstd")
+        self.assertEqual("MyApp.pkg.tar.zst", SETTINGS["installer"])
+        installer_setting = self._read_settings("linux.json")["installer"]
+        self.assertEqual("${app_name}.pkg.tar.zst", installer_setting)
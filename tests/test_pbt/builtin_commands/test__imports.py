@@ -0,0 +1,64 @@
+from ppt.builtin_commands._imports import (
+    _trace_script_imports,
+    get_frozen_modules,
+    suggest_imports,
+)
+from ppt.paths import project_path
+from os import makedirs
+from os.path import join
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from tests.test_pbt import PbtTest
+from unittest import TestCase
+
+import os
+
+
+class SuggestImportsTest(TestCase):
+    def test_suggest_imports(self):
+        imported = ["__main__", "json", "my_app", "my_app.plugin", "six"]
+        frozen = ["json", "my_app", "numpy", "numpy.linalg", "pyimod01_archive"]
+        hidden_imports, excludes = suggest_imports(imported, frozen)
+        self.assertEqual(["my_app.plugin", "six"], hidden_imports)
+        self.assertEqual(["numpy"], excludes)
+
+    def test_never_excludes_stdlib(self):
+        # Python loads eg. encodings at startup, so the trace doesn't have them:
+        imported = ["helper"]
+        frozen = ["encodings", "encodings.utf_8", "helper", "os", "numpy"]
+        self.assertEqual(["numpy"], suggest_imports(imported, frozen)[1])
+
+    def test_traced_script(self):
+        with TemporaryDirectory() as tmp_dir:
+            Path(tmp_dir, "helper.py").write_text("")
+            script = join(tmp_dir, "main.py")
+            Path(script).write_text("import helper\n")
+            imported = _trace_script_imports(script, dict(os.environ))
+        frozen = ["codecs", "encodings", "helper", "io", "json", "os", "stat"]
+        self.assertEqual(([], []), suggest_imports(imported, frozen))
+
+
+class GetFrozenModulesTest(PbtTest):
+    def test_get_frozen_modules(self):
+        self.init_pbt()
+        work_dir = project_path("target/PyInstaller/${app_name}")
+        makedirs(work_dir)
+        Path(work_dir, "PYZ-00.toc").write_text(
+            "('/tmp/PYZ-00.pyz',\n"
+            " [('json', '/usr/lib/json/__init__.py', 'PYMODULE'),\n"
+            "  ('base_library.zip', '/tmp/base_library.zip', 'DATA')])"
+        )
+        self.assertEqual(["json"], get_frozen_modules())
+
+
+class TraceScriptImportsTest(TestCase):
+    def test_sibling_module(self):
+        with TemporaryDirectory() as tmp_dir:
+            Path(tmp_dir, "helper.py").write_text("")
+            script = join(tmp_dir, "main.py")
+            Path(script).write_text("import helper\n")
+            imported = _trace_script_imports(script, dict(os.environ))
+        self.assertIn("helper", imported)
+        # Loaded by the interpreter, site or the tracer, not by the app:
+        for module in ("_distutils_hack", "runpy", "site"):
+            self.assertNotIn(module, imported)
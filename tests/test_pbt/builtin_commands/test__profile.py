@@ -0,0 +1,36 @@
+from ppt.builtin_commands._profile import (
+    _run_once,
+    get_regressions,
+    parse_import_times,
+)
+from ppt.error import PbtError
+from unittest import TestCase
+
+import sys
+
+
+class ProfileStartupTest(TestCase):
+    def test_parse_import_times(self):
+        stderr = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   _io\n"
+            "import time:       300 |        420 | io\n"
+            "import time:        50 |         50 | my_app\n"
+        )
+        self.assertEqual({"io": 420, "my_app": 50}, parse_import_times(stderr))
+
+    def test_get_regressions(self):
+        baseline = {"wall_time": {"median": 1.0}, "max_rss": {"median": 1000}}
+        report = {"wall_time": {"median": 1.05}, "max_rss": {"median": 1200}}
+        regressions = get_regressions(report, baseline, 0.1)
+        self.assertEqual(1, len(regressions))
+        self.assertTrue(regressions[0].startswith("Peak RSS"), regressions[0])
+
+    def test_run_once(self):
+        wall_time, _, stderr = _run_once([sys.executable, "-c", "print(1)"])
+        self.assertGreater(wall_time, 0)
+        self.assertEqual("", stderr)
+
+    def test_run_once_exit_code(self):
+        with self.assertRaisesRegex(PbtError, "exited with code 3"):
+            _run_once([sys.executable, "-c", "import sys; sys.exit(3)"])
@@ -0,0 +1,11 @@
+from ppt.builtin_commands._verify import diff_hashes
+from unittest import TestCase
+
+
+class VerifyReproducibleTest(TestCase):
+    def test_diff_hashes(self):
+        first = {"MyApp/MyApp": "1", "MyApp/lib.so": "2", "MyApp.deb": "3"}
+        second = {"MyApp/MyApp": "1", "MyApp/lib.so": "4", "MyApp.rpm": "5"}
+        self.assertEqual(
+            ["MyApp.deb", "MyApp.rpm", "MyApp/lib.so"], diff_hashes(first, second)
+        )
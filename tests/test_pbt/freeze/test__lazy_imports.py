@@ -0,0 +1,34 @@
+from ppt.freeze._lazy_imports import find_eager_imports, generate_lazy_imports_hook
+from pathlib import Path
+from subprocess import check_output
+from tests.test_pbt import TmpDirTest
+
+import sys
+
+
+class LazyImportsTest(TmpDirTest):
+    def test_hook_defers_loading(self):
+        Path(self._path("heavy.py")).write_text("print('loaded')\nVALUE = 42\n")
+        hook = generate_lazy_imports_hook(["heavy"], self._path("hook.py"))
+        script = (
+            "exec(open(%r).read())\n"
+            "import heavy\n"
+            "print('imported')\n"
+            "print(heavy.VALUE)\n" % hook
+        )
+        output = check_output(
+            [sys.executable, "-c", script], cwd=self._tmp_dir.name, text=True
+        )
+        self.assertEqual(["imported", "loaded", "42"], output.split())
+
+    def test_find_eager_imports(self):
+        Path(self._path("main.py")).write_text(
+            "import heavy\n"
+            "from heavy import *\n"
+            "from heavy import thing\n"
+            "import heavy.sub\n"
+            "from other import thing\n"
+        )
+        result = find_eager_imports(self._tmp_dir.name, ["heavy"])
+        self.assertEqual([2, 3, 4], [line for _, line, _ in result])
+        self.assertIn("from heavy import *", result[0][2])
@@ -0,0 +1,44 @@
+from ppt.error import PbtError
+from ppt.paths import project_path
+from ppt.freeze.linux import strip_binaries
+from glob import glob
+from os import listdir, makedirs
+from os.path import exists, getsize, join
+from shutil import copy
+from tests.test_pbt import PbtTest
+
+import os
+import sysconfig
+
+
+class StripBinariesTest(PbtTest):
+    def setUp(self):
+        super().setUp()
+        self._update_settings("base.json", {"freeze_dir": "target/MyApp"})
+        self.init_pbt("Linux")
+        lib_dynload = join(sysconfig.get_paths()["platstdlib"], "lib-dynload")
+        extensions = glob(join(lib_dynload, "*.so"))
+        if not extensions:
+            self.skipTest("No shared library to strip")
+        makedirs(project_path("${freeze_dir}"))
+        self._lib = project_path("${freeze_dir}/libexample.so")
+        copy(extensions[0], self._lib)
+
+    def test_strip_binaries(self):
+        size_before = getsize(self._lib)
+        strip_binaries()
+        self.assertLessEqual(getsize(self._lib), size_before)
+        self.assertEqual(1, len(listdir(project_path("cache/stripped"))))
+
+    def test_split_debug(self):
+        strip_binaries(split_debug=True)
+        self.assertTrue(exists(project_path("target/debug/libexample.so.debug")))
+
+    def test_missing_strip(self):
+        path_before = os.environ["PATH"]
+        os.environ["PATH"] = self._tmp_dir.name
+        try:
+            with self.assertRaisesRegex(PbtError, "'strip'"):
+                strip_binaries()
+        finally:
+            os.environ["PATH"] = path_before
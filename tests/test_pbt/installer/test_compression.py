@@ -0,0 +1,30 @@
+from ppt.installer.compression import (
+    benchmark_compression,
+    compress_file,
+    decompress_file,
+    is_available,
+    CODECS,
+)
+from pathlib import Path
+from tests.test_pbt import TmpDirTest
+
+
+class CompressionTest(TmpDirTest):
+    def test_round_trip(self):
+        src = self._path("src")
+        Path(src).write_bytes(b"ppt" * 1000)
+        for codec in filter(is_available, CODECS):
+            compressed = self._path("compressed." + codec)
+            decompressed = self._path("decompressed." + codec)
+            compress_file(src, compressed, codec, 1)
+            decompress_file(compressed, decompressed, codec)
+            self.assertEqual(b"ppt" * 1000, Path(decompressed).read_bytes())
+
+    def test_benchmark_compression(self):
+        for i in range(10):
+            Path(self._tmp_dir.name, "%d.txt" % i).write_text("file %d\n" % i * 100)
+        results = benchmark_compression(self._tmp_dir.name, 4096, 1024 * 1024)
+        self.assertTrue(results)
+        costs = [r["cost"] for r in results]
+        self.assertEqual(sorted(costs), costs)
+        self.assertGreater(results[0]["ratio"], 1)
@@ -0,0 +1,69 @@
+from ppt.installer.deb import _read_ar_members, read_deb_control, write_deb
+from io import BytesIO
+from os import link, makedirs
+from os.path import dirname, join
+from pathlib import Path
+from shutil import which
+from subprocess import check_output
+from tests.test_pbt import TmpDirTest
+from unittest import skipIf
+
+import hashlib
+import tarfile
+
+
+class WriteDebTest(TmpDirTest):
+    def setUp(self):
+        super().setUp()
+        self._root = self._path("installer")
+        for rel_path in ("opt/MyApp/MyApp", "usr/share/applications/MyApp.desktop"):
+            path = join(self._root, rel_path)
+            makedirs(dirname(path), exist_ok=True)
+            Path(path).write_text(rel_path)
+
+    def test_control(self):
+        deb = self._write_deb()
+        control = read_deb_control(deb)
+        self.assertEqual("myapp", control["Package"])
+        self.assertEqual("1.2.3", control["Version"])
+        self.assertEqual("Line one\n line two", control["Description"])
+        self.assertEqual("1", control["Installed-Size"])
+        self.assertNotIn("Depends", control)
+
+    def test_reproducible(self):
+        first = Path(self._write_deb("first.deb")).read_bytes()
+        second = Path(self._write_deb("second.deb")).read_bytes()
+        self.assertEqual(first, second)
+
+    def test_streamed_data(self):
+        executable = join(self._root, "opt/MyApp/MyApp")
+        link(executable, join(self._root, "opt/MyApp/MyApp-link"))
+        members = dict(_read_ar_members(self._write_deb(compression="xz")))
+        self.assertEqual(
+            ["control.tar.gz", "data.tar.xz", "debian-binary"], sorted(members)
+        )
+        with tarfile.open(fileobj=BytesIO(members["data.tar.xz"])) as tar:
+            self.assertTrue(tar.getmember("./opt/MyApp/MyApp-link").islnk())
+        with tarfile.open(fileobj=BytesIO(members["control.tar.gz"])) as tar:
+            md5sums = tar.extractfile("./md5sums").read().decode("utf-8")
+        md5 = hashlib.md5(b"opt/MyApp/MyApp").hexdigest()
+        self.assertIn("%s  opt/MyApp/MyApp\n" % md5, md5sums)
+        self.assertIn("%s  opt/MyApp/MyApp-link\n" % md5, md5sums)
+
+    @skipIf(not which("dpkg-deb"), "dpkg-deb is not available")
+    def test_dpkg_deb(self):
+        contents = check_output(["dpkg-deb", "-c", self._write_deb()], text=True)
+        self.assertIn("./opt/MyApp/MyApp", contents)
+
+    def _write_deb(self, name="MyApp.deb", compression="gzip"):
+        dest = self._path(name)
+        control = {
+            "Package": "myapp",
+            "Version": "1.2.3",
+            "Architecture": "amd64",
+            "Maintainer": "Jane <jane@example.com>",
+            "Depends": "",
+            "Description": "Line one\nline two",
+        }
+        write_deb(dest, self._root, control, compression, mtime=1234567890)
+        return dest
@@ -0,0 +1,87 @@
+from ppt.error import PbtError
+from ppt.installer.deb import read_deb_control
+from ppt.installer.linux import (
+    create_installers,
+    get_depends,
+    get_installer_path,
+    get_supported_codecs,
+    rename_pacman_installer,
+    _get_fpm_compression_args,
+)
+from ppt.paths import project_path
+from os import makedirs
+from os.path import dirname
+from pathlib import Path
+from tests.test_pbt import PbtTest
+from unittest import TestCase
+
+
+class CreateInstallersTest(PbtTest):
+    def setUp(self):
+        super().setUp()
+        self._update_settings(
+            "base.json",
+            {
+                "deb_backend": "native",
+                "installer_compression": "xz",
+                "installer_compression_level": 9,
+                "depends": ["libqt5gui5"],
+                "depends_rpm": ["qt5-qtbase-gui"],
+            },
+        )
+        self.init_pbt("Linux")
+        executable = project_path("target/installer/opt/MyApp/MyApp")
+        makedirs(dirname(executable))
+        Path(executable).write_text("MyApp")
+
+    def test_native_deb(self):
+        (dest,) = create_installers(["deb"])
+        self.assertEqual(project_path("target/MyApp.deb"), dest)
+        self.assertEqual("myapp", read_deb_control(dest)["Package"])
+
+    def test_depends(self):
+        self.assertEqual(["libqt5gui5"], get_depends("deb"))
+        self.assertEqual(["qt5-qtbase-gui"], get_depends("rpm"))
+        self.assertEqual(["libqt5gui5"], get_depends("pacman"))
+        (dest,) = create_installers(["deb"])
+        self.assertEqual("libqt5gui5", read_deb_control(dest)["Depends"])
+
+    def test_unsupported_format(self):
+        with self.assertRaises(PbtError):
+            create_installers(["deb", "snap"])
+
+    def test_fpm_compression_args(self):
+        self.assertEqual(
+            ["--rpm-compression", "xzmt", "--rpm-compression-level", "9"],
+            _get_fpm_compression_args("rpm"),
+        )
+        self.assertEqual(
+            ["--pacman-compression", "xz"], _get_fpm_compression_args("pacman")
+        )
+
+
+class PacmanExtensionTest(PbtTest):
+    def test_extension_follows_compression(self):
+        self._update_settings("base.json", {"installer_compression": "zstd"})
+        self.init_pbt("Linux")
+        self.assertEqual(
+            project_path("target/MyApp.pkg.tar.zst"), get_installer_path("pacman")
+        )
+        self.assertEqual(
+            ["--pacman-compression", "zstd"], _get_fpm_compression_args("pacman")
+        )
+
+
+class SupportedCodecsTest(TestCase):
+    def test_get_supported_codecs(self):
+        self.assertEqual(
+            ["gzip", "bzip2", "xz", "zstd"], get_supported_codecs(["pacman"])
+        )
+        # fpm can't create rpms with zstd. Old versions of dpkg can't read it:
+        self.assertEqual(["gzip", "bzip2", "xz"], get_supported_codecs(["deb", "rpm"]))
+
+    def test_rename_pacman_installer(self):
+        self.assertEqual(
+            "${app_name}.pkg.tar.zst",
+            rename_pacman_installer("${app_name}.pkg.tar.xz", "zstd"),
+        )
@@ -0,0 +1,42 @@
+from ppt.installer import _generate_installer_resources
+from ppt.installer.windows import (
+    create_installer_windows,
+    _get_compression_args,
+    _get_fingerprint,
+    _FINGERPRINT_PATH,
+)
+from ppt.paths import project_path
+from os import makedirs
+from pathlib import Path
+from tests.test_pbt import PbtTest
+
+
+class CreateInstallerWindowsTest(PbtTest):
+    def setUp(self):
+        super().setUp()
+        self._update_settings(
+            "base.json",
+            {
+                "freeze_dir": "target/MyApp",
+                "nsis_compressor": "lzma",
+                "nsis_solid": False,
+                "nsis_dict_size": 64,
+            },
+        )
+        self.init_pbt("Windows")
+        makedirs(project_path("${freeze_dir}"))
+        Path(project_path("${freeze_dir}/MyApp.exe")).write_text("MyApp")
+
+    def test_compression_args(self):
+        self.assertEqual(
+            ["-XSetCompressor /FINAL lzma", "-XSetCompressorDictSize 64"],
+            _get_compression_args(),
+        )
+
+    def test_skips_unchanged(self):
+        Path(project_path("target/${installer}")).write_text("previous build")
+        _generate_installer_resources()
+        args = ["makensis"] + _get_compression_args() + ["Installer.nsi"]
+        Path(project_path(_FINGERPRINT_PATH)).write_text(_get_fingerprint(args))
+        # Would raise FileNotFoundError if it tried to run makensis:
+        create_installer_windows()
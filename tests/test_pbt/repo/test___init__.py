@@ -0,0 +1,45 @@
+from ppt.paths import project_path
+from ppt.repo import get_expired_versions, get_repo_dir, update_versions
+from ppt._variables import set_version
+from os import makedirs
+from os.path import exists, join
+from pathlib import Path
+from tests.test_pbt import PbtTest
+from unittest import TestCase
+
+
+class GetExpiredVersionsTest(TestCase):
+    def test_keep_last(self):
+        versions = {v: {"added": "2024-01-01"} for v in ("1.0.0", "1.10.0", "1.2.0")}
+        self.assertEqual(
+            ["1.0.0"], get_expired_versions(versions, "1.10.0", {"keep_last": 2})
+        )
+
+    def test_newer_than(self):
+        versions = {
+            "1.0.0": {"added": "2024-01-01"},
+            "1.1.0": {"added": "2024-06-01"},
+            "1.2.0": {"added": "2023-01-01"},
+        }
+        retention = {"newer_than": "2024-02-01"}
+        # The current version is always kept:
+        self.assertEqual(["1.0.0"], get_expired_versions(versions, "1.2.0", retention))
+
+    def test_no_retention(self):
+        versions = {"1.0.0": {"added": "2024-01-01"}}
+        self.assertEqual([], get_expired_versions(versions, "1.1.0", None))
+
+
+class UpdateVersionsTest(PbtTest):
+    def test_removes_files_of_old_versions(self):
+        self._update_settings("base.json", {"repo_retention": {"keep_last": 1}})
+        self.init_pbt("Linux")
+        for version in ("1.0.0", "1.1.0"):
+            set_version(version)
+            makedirs(join(get_repo_dir(), version))
+            Path(get_repo_dir(), version, "MyApp.rpm").write_text(version)
+            removed = update_versions([version])
+        self.assertEqual(["1.0.0"], removed)
+        self.assertFalse(exists(join(get_repo_dir(), "1.0.0")))
+        self.assertTrue(exists(join(get_repo_dir(), "1.1.0", "MyApp.rpm")))
+        self.assertTrue(exists(project_path("cache/repo_versions.json")))
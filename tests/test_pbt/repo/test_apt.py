@@ -0,0 +1,95 @@
+from ppt.installer.deb import parse_control, write_deb
+from ppt.repo.apt import get_pool_path, write_apt_metadata
+from os import makedirs, remove
+from os.path import dirname, exists, join
+from pathlib import Path
+from tests.test_pbt import TmpDirTest
+
+import gzip
+import hashlib
+import lzma
+
+
+class WriteAptMetadataTest(TmpDirTest):
+    def setUp(self):
+        super().setUp()
+        self._repo_dir = self._path("repo")
+        self._dist_dir = join(self._repo_dir, "dists", "stable")
+        self._index_dir = join(self._dist_dir, "main", "binary-amd64")
+        self._root = self._path("installer")
+        makedirs(join(self._root, "opt", "MyApp"))
+        Path(self._root, "opt", "MyApp", "MyApp").write_text("#!/bin/sh\n")
+
+    def test_packages(self):
+        self._add_package("1.0.0")
+        self._add_package("1.1.0")
+        self._write_metadata()
+        packages = Path(self._index_dir, "Packages").read_text()
+        stanzas = [parse_control(s) for s in packages.split("\n\n")]
+        self.assertEqual(["1.0.0", "1.1.0"], [s["Version"] for s in stanzas])
+        deb_path = join(self._repo_dir, *stanzas[1]["Filename"].split("/"))
+        expected = hashlib.sha256(Path(deb_path).read_bytes()).hexdigest()
+        self.assertEqual(expected, stanzas[1]["SHA256"])
+        gz_path = join(self._index_dir, "Packages.gz")
+        with gzip.open(gz_path, "rt") as f:
+            self.assertEqual(packages, f.read())
+        with lzma.open(join(self._index_dir, "Packages.xz"), "rt") as f:
+            self.assertEqual(packages, f.read())
+
+    def test_release(self):
+        self._add_package("1.0.0")
+        self._write_metadata()
+        release = parse_control(Path(self._dist_dir, "Release").read_text())
+        self.assertEqual("MyApp", release["Origin"])
+        self.assertEqual("yes", release["Acquire-By-Hash"])
+        entries = release["SHA256"].split()
+        self.assertEqual(9, len(entries))
+        for digest, size, path in zip(entries[::3], entries[1::3], entries[2::3]):
+            data = Path(self._dist_dir, path).read_bytes()
+            self.assertEqual(int(size), len(data))
+            self.assertEqual(hashlib.sha256(data).hexdigest(), digest)
+            by_hash = join(self._index_dir, "by-hash", "SHA256", digest)
+            self.assertEqual(data, Path(by_hash).read_bytes())
+
+    def test_by_hash_keeps_previous_release(self):
+        pool_path = self._add_package("1.0.0")
+        self._write_metadata()
+        first = self._get_packages_sha256()
+        self._add_package("1.1.0")
+        self._write_metadata()
+        second = self._get_packages_sha256()
+        remove(join(self._repo_dir, *pool_path.split("/")))
+        self._write_metadata()
+        by_hash_dir = join(self._index_dir, "by-hash", "SHA256")
+        self.assertFalse(exists(join(by_hash_dir, first)))
+        self.assertTrue(exists(join(by_hash_dir, second)))
+        self.assertTrue(exists(join(by_hash_dir, self._get_packages_sha256())))
+
+    def _add_package(self, version):
+        control = {
+            "Package": "myapp",
+            "Version": version,
+            "Architecture": "amd64",
+            "Maintainer": "Jane <jane@example.com>",
+            "Description": "My app",
+        }
+        pool_path = get_pool_path(control, "main")
+        dest = join(self._repo_dir, *pool_path.split("/"))
+        makedirs(dirname(dest), exist_ok=True)
+        write_deb(dest, self._root, control, "gzip", mtime=1234567890)
+        return pool_path
+
+    def _write_metadata(self):
+        distribution = {
+            "Origin": "MyApp",
+            "Label": "MyApp",
+            "Codename": "stable",
+            "Architectures": "amd64",
+            "Components": "main",
+            "Description": "My app",
+        }
+        write_apt_metadata(self._repo_dir, distribution)
+
+    def _get_packages_sha256(self):
+        data = Path(self._index_dir, "Packages").read_bytes()
+        return hashlib.sha256(data).hexdigest()
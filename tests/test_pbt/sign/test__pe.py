@@ -0,0 +1,54 @@
+from ppt.sign._pe import has_authenticode_signature
+from os.path import join
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+import struct
+
+
+class HasAuthenticodeSignatureTest(TestCase):
+    def test_signed(self):
+        cert = struct.pack("<IHH", 16, 0x0200, 0x0002) + b"\0" * 8
+        self.assertIs(True, self._check(_pe(cert)))
+
+    def test_unsigned(self):
+        self.assertIs(False, self._check(_pe()))
+
+    def test_pe32(self):
+        self.assertIs(False, self._check(_pe(magic=0x10B)))
+
+    def test_unknown_certificate_type(self):
+        cert = struct.pack("<IHH", 16, 0x0200, 0x0001) + b"\0" * 8
+        self.assertIsNone(self._check(_pe(cert)))
+
+    def test_truncated(self):
+        cert = struct.pack("<IHH", 16, 0x0200, 0x0002) + b"\0" * 8
+        self.assertIsNone(self._check(_pe(cert)[:-4]))
+
+    def test_not_pe(self):
+        self.assertIsNone(self._check(b"MSCF" + b"\0" * 100))
+
+    def _check(self, data):
+        with TemporaryDirectory() as tmp_dir:
+            path = join(tmp_dir, "file.dll")
+            Path(path).write_bytes(data)
+            return has_authenticode_signature(path)
+
+
+def _pe(cert=b"", magic=0x20B):
+    """
+    Return a minimal PE file with the given WIN_CERTIFICATE appended.
+    """
+    dirs_offset = 96 if magic == 0x10B else 112
+    optional_header = bytearray(dirs_offset + 16 * 8)
+    struct.pack_into("<H", optional_header, 0, magic)
+    struct.pack_into("<I", optional_header, dirs_offset - 4, 16)
+    dos_header = bytearray(64)
+    dos_header[:2] = b"MZ"
+    struct.pack_into("<I", dos_header, 0x3C, 64)
+    coff_header = struct.pack("<HHIIIHH", 0x8664, 0, 0, 0, 0, len(optional_header), 0)
+    size = len(dos_header) + 4 + len(coff_header) + len(optional_header)
+    if cert:
+        struct.pack_into("<II", optional_header, dirs_offset + 4 * 8, size, len(cert))
+    return bytes(dos_header) + b"PE\0\0" + coff_header + bytes(optional_header) + cert
@@ -0,0 +1,89 @@
+from ppt.paths import project_path
+from ppt.sign.windows import sign_files, _SignHelper
+from os import makedirs
+from os.path import dirname, exists, join
+from pathlib import Path
+from tests.test_pbt import PbtTest
+
+import json
+import sys
+
+# Appends the digest algorithm to each file, so we can see what was signed.
+# Also logs each invocation:
+_FAKE_SIGNER = """\
+import sys
+with open(sys.argv[1], "a") as f:
+    f.write("signed\\n")
+for path in sys.argv[3:]:
+    with open(path, "ab") as f:
+        f.write(sys.argv[2].encode("ascii"))
+"""
+
+
+class SignFilesTest(PbtTest):
+    def setUp(self):
+        super().setUp()
+        self._log_path = join(self._tmp_dir.name, "signer.log")
+        self._update_settings(
+            "base.json",
+            {
+                "freeze_dir": "target/MyApp",
+                "windows_sign_pass": "secret",
+                "windows_sign_command": [
+                    sys.executable,
+                    "-c",
+                    _FAKE_SIGNER,
+                    self._log_path,
+                    "{digest}",
+                    "{files}",
+                ],
+                "windows_sign_batch_size": 2,
+            },
+        )
+        self.init_pbt("Windows")
+        _SignHelper._INSTANCE = None
+        self._files = [
+            self._write("MyApp.exe"),
+            self._write("a/plugin.dll"),
+            self._write("b/plugin.dll"),
+            self._write("c.dll"),
+        ]
+
+    def test_sign_files(self):
+        sign_files(self._files)
+        for file_path in self._files:
+            self.assertEqual(b"unsignedsha1sha256", Path(file_path).read_bytes())
+
+    def test_content_addressed_cache(self):
+        Path(self._files[2]).write_bytes(b"other")
+        sign_files(self._files)
+        # a/plugin.dll and b/plugin.dll have the same name but different
+        # contents. The other three files have the same contents:
+        self.assertEqual(b"othersha1sha256", Path(self._files[2]).read_bytes())
+        self.assertEqual(b"unsignedsha1sha256", Path(self._files[1]).read_bytes())
+        with open(project_path("cache/signed/index.json")) as f:
+            index = json.load(f)
+        self.assertEqual(2, len(index))
+        for key in index:
+            object_path = "cache/signed/objects/%s/%s" % (key[:2], key)
+            self.assertTrue(exists(project_path(object_path)))
+
+    def test_cached(self):
+        sign_files(self._files)
+        # Restore the unsigned files. They should be taken from the cache:
+        for file_path in self._files:
+            Path(file_path).write_bytes(b"unsigned")
+        sign_files(self._files)
+        self.assertEqual(b"unsignedsha1sha256", Path(self._files[0]).read_bytes())
+        # Once for sha1, once for sha256:
+        self.assertEqual(2, len(Path(self._log_path).read_text().split()))
+
+    def tearDown(self):
+        _SignHelper._INSTANCE = None
+        super().tearDown()
+
+    def _write(self, rel_path):
+        path = project_path("${freeze_dir}/" + rel_path)
+        makedirs(dirname(path), exist_ok=True)
+        Path(path).write_bytes(b"unsigned")
+        return path
@@ -0,0 +1,34 @@
+from ppt._files import deduplicate_files, hash_tree, link_tree, set_mtimes
+from os.path import getmtime, samefile
+from pathlib import Path
+from tests.test_pbt import TmpDirTest
+
+
+class DeduplicateFilesTest(TmpDirTest):
+    def test_deduplicate_files(self):
+        Path(self._path("a.txt")).write_text("same")
+        Path(self._path("sub", "b.txt")).write_text("same")
+        Path(self._path("c.txt")).write_text("diff")
+        self.assertEqual(4, deduplicate_files(self._tmp_dir.name))
+        self.assertTrue(samefile(self._path("a.txt"), self._path("sub", "b.txt")))
+        self.assertFalse(samefile(self._path("a.txt"), self._path("c.txt")))
+        self.assertEqual("same", Path(self._path("sub", "b.txt")).read_text())
+
+    def test_link_tree(self):
+        Path(self._path("src", "sub", "a.txt")).write_text("a")
+        link_tree(self._path("src"), self._path("dest"))
+        dest_a = self._path("dest", "sub", "a.txt")
+        self.assertEqual("a", Path(dest_a).read_text())
+        self.assertTrue(samefile(self._path("src", "sub", "a.txt"), dest_a))
+
+    def test_hash_tree(self):
+        Path(self._path("sub", "a.txt")).write_text("a")
+        digests = hash_tree(self._tmp_dir.name)
+        self.assertEqual(["sub/a.txt"], list(digests))
+        self.assertEqual(64, len(digests["sub/a.txt"]))
+
+    def test_set_mtimes(self):
+        Path(self._path("sub", "a.txt")).write_text("a")
+        set_mtimes(self._tmp_dir.name, 315532800)
+        self.assertEqual(315532800, getmtime(self._path("sub", "a.txt")))
+        self.assertEqual(315532800, getmtime(self._path("sub")))
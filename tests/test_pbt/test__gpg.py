@@ -0,0 +1,15 @@
+from ppt._gpg import GpgSession
+from os.path import join
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+import json
+
+
+class GpgSessionTest(TestCase):
+    def test_cached_keygrip(self):
+        with TemporaryDirectory() as cache_dir:
+            with open(join(cache_dir, "keygrips.json"), "w") as f:
+                json.dump({"0x123": "A" * 40}, f)
+            # Would fail if it asked gpg for the (non-existent) key:
+            self.assertEqual("A" * 40, GpgSession("0x123", cache_dir)._get_keygrip())
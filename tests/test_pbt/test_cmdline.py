@@ -0,0 +1,23 @@
+from ppt.builtin_commands._imports import trace_imports
+from ppt.cmdline import _parse_cmdline
+from unittest import TestCase
+
+import sys
+
+
+class ParseCmdlineTest(TestCase):
+    def test_several_options(self):
+        fn, args = self._parse(["trace_imports", "--tests", "--write"])
+        self.assertIs(trace_imports, fn)
+        self.assertEqual([True, True], args)
+
+    def test_defaults(self):
+        self.assertEqual([False, False], self._parse(["trace_imports"])[1])
+
+    def _parse(self, args):
+        argv_before = sys.argv
+        sys.argv = ["ppt"] + args
+        try:
+            return _parse_cmdline()
+        finally:
+            sys.argv = argv_before
@@ -0,0 +1,53 @@
+from ppt._files import hash_tree
+from ppt.delta import create_delta, record_release
+from ppt.paths import project_path
+from ppt._variables import set_version
+from ppt_runtime.delta import apply_delta, read_manifest
+from os import makedirs
+from os.path import join
+from pathlib import Path
+from tests.test_pbt import PbtTest
+
+import os
+
+
+class DeltaTest(PbtTest):
+    def setUp(self):
+        super().setUp()
+        self._update_settings("base.json", {"freeze_dir": "target/MyApp"})
+        self.init_pbt("Linux")
+        self._write("MyApp", "executable")
+        self._write("lib/unchanged.so", "unchanged")
+        self._write("lib/changed.so", "old version")
+        self._write("lib/removed.so", "removed")
+        set_version("1.0.0")
+        record_release()
+        self._old_dir = join(self._tmp_dir.name, "old")
+        os.rename(project_path("${freeze_dir}"), self._old_dir)
+        self._write("MyApp", "executable")
+        self._write("lib/moved/unchanged.so", "unchanged")
+        self._write("lib/changed.so", "new version")
+        self._write("lib/added.so", "added")
+        set_version("1.0.1")
+
+    def test_delta_from_history(self):
+        delta = create_delta("1.0.0", project_path("target/delta"))
+        self.assertTrue(delta.endswith("1.0.0-1.0.1.delta.zip"))
+        manifest = read_manifest(delta)
+        self.assertEqual(["lib/removed.so", "lib/unchanged.so"], manifest["removed"])
+        self.assertEqual("keep", manifest["files"]["lib/moved/unchanged.so"]["action"])
+        self.assertEqual("full", manifest["files"]["lib/added.so"]["action"])
+        self._check_apply(delta)
+
+    def test_delta_from_dir(self):
+        self._check_apply(create_delta(self._old_dir, project_path("target/delta")))
+
+    def _check_apply(self, delta):
+        new_dir = join(self._tmp_dir.name, "new")
+        apply_delta(delta, self._old_dir, new_dir)
+        self.assertEqual(hash_tree(project_path("${freeze_dir}")), hash_tree(new_dir))
+
+    def _write(self, rel_path, contents):
+        path = project_path("${freeze_dir}/" + rel_path)
+        makedirs(os.path.dirname(path), exist_ok=True)
+        Path(path).write_text(contents)
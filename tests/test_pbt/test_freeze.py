@@ -1,7 +1,10 @@
 from ppt.paths import project_path
-from ppt.freeze import _generate_resources
-from os.path import exists
+from ppt.freeze import _generate_resources, write_executables_spec
+from os.path import exists, join
+from pathlib import Path
+from tempfile import TemporaryDirectory
 from tests.test_pbt import PbtTest
+from unittest import TestCase
 
 
 class GenerateResourcesTest(PbtTest):
@@ -12,3 +15,53 @@ class GenerateResourcesTest(PbtTest):
         self.assertTrue(exists(info_plist))
         with open(info_plist) as f:
             self.assertIn("MyApp", f.read(), "Did not replace '${app_name}' by 'MyApp'")
+
+
+class WriteExecutablesSpecTest(TestCase):
+    def test_write_executables_spec(self):
+        with TemporaryDirectory() as tmp_dir:
+            spec_path = join(tmp_dir, "MyApp.spec")
+            Path(spec_path).write_text(
+                "a = Analysis(['main.py', 'helper.py'])\n"
+                "exe = EXE('pyz', a.scripts, [], name='MyApp', console=False)\n"
+                "coll = COLLECT(exe, 'binaries', name='MyApp')\n"
+                "app = BUNDLE(coll, name='MyApp.app')\n"
+            )
+            combined = join(tmp_dir, "combined.spec")
+            write_executables_spec(spec_path, ["MyApp", "helper"], combined)
+            calls = []
+
+            def record(fn, result=None):
+                def recorder(*args, **kwargs):
+                    calls.append((fn, args, kwargs))
+                    return result or kwargs.get("name")
+
+                return recorder
+
+            scripts = [("pyi_rth", "hook"), ("main", "main.py"), ("helper", "h.py")]
+            namespace = {
+                "Analysis": record("Analysis", type("A", (), {"scripts": scripts})),
+                "EXE": record("EXE"),
+                "COLLECT": record("COLLECT"),
+                "BUNDLE": record("BUNDLE"),
+            }
+            exec(Path(combined).read_text(), namespace)
+        hook = ("pyi_rth", "hook")
+        self.assertEqual(
+            [
+                ("Analysis", (["main.py", "helper.py"],), {}),
+                (
+                    "EXE",
+                    ("pyz", [hook, ("main", "main.py")], []),
+                    {"name": "MyApp", "console": False},
+                ),
+                (
+                    "EXE",
+                    ("pyz", [hook, ("helper", "h.py")], []),
+                    {"name": "helper", "console": False},
+                ),
+                ("COLLECT", ("MyApp", "helper", "binaries"), {"name": "MyApp"}),
+                ("BUNDLE", ("MyApp",), {"name": "MyApp.app"}),
+            ],
+            calls,
+        )
@@ -0,0 +1,28 @@
+from ppt.resources import copy_with_filtering
+from os import link, makedirs
+from os.path import join
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+
+class CopyWithFilteringTest(TestCase):
+    def test_does_not_write_through_hard_links(self):
+        with TemporaryDirectory() as tmp_dir:
+            frozen = join(tmp_dir, "frozen.txt")
+            Path(frozen).write_text("frozen")
+            src_dir, dest_dir = join(tmp_dir, "src"), join(tmp_dir, "dest")
+            makedirs(src_dir)
+            makedirs(dest_dir)
+            for name in ("copied.txt", "filtered.txt"):
+                Path(src_dir, name).write_text("${app_name}")
+                link(frozen, join(dest_dir, name))
+            copy_with_filtering(
+                src_dir,
+                dest_dir,
+                {"app_name": "MyApp"},
+                [join(src_dir, "filtered.txt")],
+            )
+            self.assertEqual("frozen", Path(frozen).read_text())
+            self.assertEqual("${app_name}", Path(dest_dir, "copied.txt").read_text())
+            self.assertEqual("MyApp", Path(dest_dir, "filtered.txt").read_text())
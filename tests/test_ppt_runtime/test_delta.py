@@ -0,0 +1,34 @@
+from ppt_runtime.delta import apply_delta, DeltaError, MANIFEST_NAME
+from os import makedirs
+from os.path import join
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+import hashlib
+import json
+import zipfile
+
+
+class ApplyDeltaTest(TestCase):
+    def test_rejects_modified_source(self):
+        with TemporaryDirectory() as tmp_dir:
+            old_dir = join(tmp_dir, "old")
+            makedirs(old_dir)
+            Path(old_dir, "a.txt").write_text("modified")
+            delta = join(tmp_dir, "delta.zip")
+            sha256 = hashlib.sha256(b"original").hexdigest()
+            manifest = {
+                "files": {
+                    "a.txt": {
+                        "sha256": sha256,
+                        "mode": 0o644,
+                        "action": "keep",
+                        "source": "a.txt",
+                    }
+                }
+            }
+            with zipfile.ZipFile(delta, "w") as archive:
+                archive.writestr(MANIFEST_NAME, json.dumps(manifest))
+            with self.assertRaises(DeltaError):
+                apply_delta(delta, old_dir, join(tmp_dir, "new"))
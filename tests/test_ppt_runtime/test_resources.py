@@ -0,0 +1,47 @@
+from ppt.resources import pack_resources
+from ppt_runtime.resources import ResourcePack
+from importlib.util import find_spec
+from pathlib import Path
+from tests.test_pbt import TmpDirTest
+from unittest import skipIf
+
+
+class ResourcePackTest(TmpDirTest):
+    def setUp(self):
+        super().setUp()
+        files = {
+            "text.txt": b"hello " * 1000,
+            "images/logo.png": b"\x89PNG" * 100,
+            "empty.txt": b"",
+        }
+        for name, contents in files.items():
+            Path(self._path("resources", name)).write_bytes(contents)
+
+    def test_round_trip(self):
+        pack = self._pack()
+        try:
+            self.assertEqual(["empty.txt", "images/logo.png", "text.txt"], pack.names())
+            self.assertEqual(b"\x89PNG" * 100, pack.get_bytes("images/logo.png"))
+            self.assertEqual(b"", pack.get_bytes("empty.txt"))
+            view = pack.get_view("text.txt")
+            self.assertIsInstance(view, memoryview)
+            self.assertEqual(b"hello " * 1000, view)
+            view.release()
+            with self.assertRaises(FileNotFoundError):
+                pack.get_view("missing.txt")
+        finally:
+            pack.close()
+
+    @skipIf(not find_spec("zstandard"), "zstandard is not installed")
+    def test_zstd(self):
+        pack = self._pack("zstd")
+        try:
+            self.assertEqual(b"hello " * 1000, pack.get_bytes("text.txt"))
+        finally:
+            pack.close()
+
+
+    def _pack(self, compression=None):
+        pack_path = self._path("resources.pack")
+        pack_resources(self._path("resources"), pack_path, compression)
+        return ResourcePack(pack_path)
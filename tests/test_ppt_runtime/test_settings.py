@@ -0,0 +1,36 @@
+from ppt._fbs import write_public_settings_module
+from os.path import dirname
+from subprocess import check_output
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+import os
+import ppt_runtime
+import sys
+
+
+class PublicSettingsTest(TestCase):
+    def test_get_public_settings(self):
+        settings = {
+            "app_name": "MyApp",
+            "version": "1.2.3",
+            "gpg_pass": "secret",
+            "public_settings": ["app_name", "version"],
+        }
+        with TemporaryDirectory() as tmp_dir:
+            write_public_settings_module(settings, tmp_dir)
+            pythonpath = [tmp_dir, dirname(dirname(ppt_runtime.__file__))]
+            env = dict(os.environ, PYTHONPATH=os.pathsep.join(pythonpath))
+            output = check_output(
+                [
+                    sys.executable,
+                    "-c",
+                    "from ppt_runtime.settings import get_public_settings\n"
+                    "print(sorted(get_public_settings().items()))",
+                ],
+                env=env,
+                text=True,
+            )
+        self.assertEqual(
+            "[('app_name', 'MyApp'), ('version', '1.2.3')]", output.strip()
+        )